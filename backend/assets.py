@@ -0,0 +1,144 @@
+import base64
+import binascii
+import hashlib
+import re
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+import settings
+
+
+# ============================================================
+#         TEMPLATE ASSETS (content-addressed image store)
+# ============================================================
+# Image bytes are stored once in template_assets, keyed by the sha256 of
+# their content. Saved templates keep only {"asset": <hash>} on image
+# blocks; the URL to fetch the image is filled in when the template is
+# read, so the stored template does not depend on the host name.
+#
+# Assets are served from the API's own origin, so only raster image types
+# are accepted (SVG and HTML could carry scripts). Responses also carry
+# nosniff and a Content-Security-Policy that blocks any active content.
+
+DATA_URL_RE = re.compile(r"^data:(?P<type>[\w.+-]+/[\w.+-]+)?(?:;[^,]*?)?;base64,", re.IGNORECASE)
+
+# Assets never change for a given hash, so they can be cached forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+# Some browsers label JPEG data URLs "image/jpg"
+CONTENT_TYPE_ALIASES = {"image/jpg": "image/jpeg", "image/pjpeg": "image/jpeg"}
+
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "default-src 'none'; sandbox",
+}
+
+INSERT_ASSET_SQL = text("""
+    INSERT INTO template_assets (hash, content_type, size, data, created_at)
+    VALUES (:hash, :content_type, :size, :data, :created)
+    ON CONFLICT (hash) DO NOTHING
+""")
+
+SELECT_ASSET_SQL = text("""
+    SELECT content_type, data FROM template_assets WHERE hash = :hash
+""")
+
+
+def parse_data_url(value):
+    """
+    Return (content_type, bytes) for a base64 data URL, else None.
+    Data URLs of anything but a raster image are rejected with 400.
+    """
+    if not isinstance(value, str):
+        return None
+
+    match = DATA_URL_RE.match(value)
+    if match is None:
+        return None
+
+    content_type = (match.group("type") or "").lower()
+    content_type = CONTENT_TYPE_ALIASES.get(content_type, content_type)
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image type '{content_type or 'none'}' (use PNG, JPEG, GIF or WebP)"
+        )
+
+    try:
+        data = base64.b64decode(value[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid base64 image data")
+
+    return content_type, data
+
+
+def store_asset(conn, content_type, data):
+    if len(data) > settings.MAX_ASSET_BYTES:
+        raise HTTPException(status_code=413, detail="Asset is too large")
+
+    digest = hashlib.sha256(data).hexdigest()
+    conn.execute(INSERT_ASSET_SQL, {
+        "hash": digest,
+        "content_type": content_type,
+        "size": len(data),
+        "data": data,
+        "created": datetime.now().isoformat()
+    })
+    return digest
+
+
+def load_asset(conn, digest):
+    return conn.execute(SELECT_ASSET_SQL, {"hash": digest}).fetchone()
+
+
+def extract_assets(conn, template):
+    """
+    Move inline base64 images out of a template before it is saved.
+
+    Any block whose "value" is a data URL has the bytes stored as an
+    asset and is rewritten to reference it by hash. A block that already
+    references an asset keeps it only while its value is still that
+    asset's URL (as expand_assets sent it); if the value was cleared or
+    replaced, the reference is dropped, so a removed image stays removed.
+    """
+    blocks = []
+    for block in template:
+        block = dict(block)
+        value = block.get("value")
+        parsed = parse_data_url(value)
+        if parsed is not None:
+            block["asset"] = store_asset(conn, *parsed)
+            block["value"] = None
+        elif block.get("asset"):
+            if is_asset_url(value, block["asset"]):
+                block["value"] = None
+            else:
+                del block["asset"]
+        blocks.append(block)
+    return blocks
+
+
+def expand_assets(template, base_url):
+    """Fill in the fetch URL of every asset-backed block."""
+    return [
+        {**block, "value": asset_url(base_url, block["asset"])} if block.get("asset") else block
+        for block in template
+    ]
+
+
+def asset_url(base_url, digest):
+    return f"{base_url.rstrip('/')}/assets/{digest}"
+
+
+def is_asset_url(value, digest):
+    """True if value is the fetch URL of this asset, on any host."""
+    return isinstance(value, str) and value.endswith(f"/assets/{digest}")
+
+
+def served_content_type(content_type):
+    """Type to serve stored bytes as; anything not allowed is a download."""
+    return content_type if content_type in ALLOWED_CONTENT_TYPES else "application/octet-stream"
@@ -0,0 +1,197 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from sqlalchemy.exc import SQLAlchemyError
+
+import quotation_store
+from database import async_engine, schema
+from listing import (
+    FORMAT_PATTERN,
+    MAX_PAGE_SIZE,
+    STREAM_BATCH_SIZE,
+    PageQuery,
+    check_format,
+    columnar_response,
+    fetch_columnar,
+    fetch_page,
+    ndjson_line,
+    ndjson_response,
+    parse_fields,
+)
+from quotation_store import QuotationWithItemsRequest, UpdateQuotationWithItemsRequest
+from serialization import json_response
+
+
+# ============================================================
+#         ASYNC ENDPOINTS (DB_MODE=async)
+# ============================================================
+# async def versions of the hot endpoints. The SQL is shared with the
+# sync handlers in main.py: the quotation_store functions run on the
+# AsyncConnection through run_sync, so I/O goes through the async driver
+# without blocking the event loop.
+
+router = APIRouter()
+
+
+async def run_read(fn, *args):
+    async with async_engine.connect() as conn:
+        return await conn.run_sync(fn, *args)
+
+
+async def run_write(fn, *args):
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(fn, *args)
+
+
+async def stream_page_lines(page):
+    async with async_engine.connect() as conn:
+        result = await conn.stream(page.statement(lookahead=False), page.params)
+        async for partition in result.partitions(STREAM_BATCH_SIZE):
+            for row in page.visible([dict(row._mapping) for row in partition]):
+                yield ndjson_line(row)
+
+
+async def stream_columnar_lines(page):
+    async with async_engine.connect() as conn:
+        result = await conn.stream(page.statement(lookahead=False), page.params)
+        columns, keep = page.visible_columns(list(result.keys()))
+        yield ndjson_line({"columns": columns})
+        async for partition in result.partitions(STREAM_BATCH_SIZE):
+            for row in partition:
+                yield ndjson_line([row[i] for i in keep])
+
+
+async def stream_quotations_with_items(page, item_columns=None):
+    async with async_engine.connect() as conn, async_engine.connect() as items_conn:
+        result = await conn.stream(page.statement(lookahead=False), page.params)
+        async for partition in result.partitions(STREAM_BATCH_SIZE):
+            quotations = page.visible([dict(row._mapping) for row in partition])
+            items_by_quotation = await items_conn.run_sync(
+                quotation_store.items_for_quotations, [q["id"] for q in quotations], item_columns
+            )
+            for entry in quotation_store.attach_items(quotations, items_by_quotation):
+                yield ndjson_line(entry)
+
+
+async def list_table(table, request, limit, after, sort, stream, fields, response_format):
+    page = PageQuery(table, schema.column_names(table), request.query_params, limit, after, sort, fields)
+    if response_format:
+        check_format(response_format, stream)
+        if stream:
+            return ndjson_response(stream_columnar_lines(page))
+        try:
+            return columnar_response(*await run_read(fetch_columnar, page), response_format)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    if stream:
+        return ndjson_response(stream_page_lines(page))
+
+    try:
+        rows, next_cursor = await run_read(fetch_page, page)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return json_response(rows, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+
+# ---------------------- List Endpoints -------------------------
+@router.get("/charges")
+async def list_charges(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    fields: Optional[str] = None,
+    response_format: Optional[str] = Query(None, alias="format", pattern=FORMAT_PATTERN)
+):
+    return await list_table("charges", request, limit, after, sort, stream, fields, response_format)
+
+
+@router.get("/quotation")
+async def list_quotation(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    fields: Optional[str] = None,
+    response_format: Optional[str] = Query(None, alias="format", pattern=FORMAT_PATTERN)
+):
+    return await list_table("quotation", request, limit, after, sort, stream, fields, response_format)
+
+
+@router.get("/items")
+async def list_items(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    fields: Optional[str] = None,
+    response_format: Optional[str] = Query(None, alias="format", pattern=FORMAT_PATTERN)
+):
+    return await list_table("items", request, limit, after, sort, stream, fields, response_format)
+
+
+# ---------------------- Quotation With Items -------------------------
+@router.post("/quotation-with-items")
+async def create_quotation_with_items(req: QuotationWithItemsRequest):
+    try:
+        return await run_write(quotation_store.create, req)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/quotation-with-items/{quotation_id}")
+async def get_quotation_with_items(
+    quotation_id: int,
+    fields: Optional[str] = None,
+    item_fields: Optional[str] = None
+):
+    columns = parse_fields("quotation", fields)
+    item_columns = quotation_store.item_projection(item_fields)
+    try:
+        return await run_read(quotation_store.fetch, quotation_id, columns, item_columns)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/quotation-with-items")
+async def get_all_quotations_with_items(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    fields: Optional[str] = None,
+    item_fields: Optional[str] = None
+):
+    page = PageQuery("quotation", schema.column_names("quotation"), request.query_params, limit, after, sort, fields)
+    item_columns = quotation_store.item_projection(item_fields)
+    if stream:
+        return ndjson_response(stream_quotations_with_items(page, item_columns))
+
+    try:
+        result, next_cursor = await run_read(quotation_store.fetch_all, page, item_columns)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return json_response(result, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+
+@router.put("/quotation-with-items/{quotation_id}")
+async def update_quotation_with_items(quotation_id: int, req: UpdateQuotationWithItemsRequest):
+    try:
+        return await run_write(quotation_store.update, quotation_id, req)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/quotation-with-items/{quotation_id}")
+async def delete_quotation_with_items(quotation_id: int):
+    try:
+        return await run_write(quotation_store.delete, quotation_id)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,191 @@
+import json
+import logging
+import secrets
+import time
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from indexes import autocommit
+
+
+# ============================================================
+#         ATTRIBUTE STORE (dynamic columns without ALTER TABLE)
+# ============================================================
+# With COLUMN_STORE=attributes, columns added through the add-column
+# endpoints are not physical columns. Their values live in one JSONB
+# "attributes" document per row (GIN-indexed), and their names and types
+# live in column_registry. Adding, renaming or dropping such a column only
+# changes column_registry, so no table lock is taken.
+#
+# Every registered column has a random storage key that never changes;
+# the document is keyed by it, so a rename is a registry update and a
+# dropped column's values are never seen again, even if a column with the
+# same name is added later. Columns that already exist physically keep
+# working as before (and are still altered with ALTER TABLE).
+#
+# The schema registry turns column names into SQL through the helpers
+# below, so endpoints select, filter, sort and write attribute columns
+# exactly like physical ones.
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTES = "attributes"
+
+REGISTRY_SQL = text("""
+    SELECT column_name, data_type, storage_key
+    FROM column_registry
+    WHERE table_name = :table
+    ORDER BY position
+""")
+
+ADD_SQL = text("""
+    INSERT INTO column_registry (table_name, column_name, data_type, storage_key, position, created_at)
+    SELECT :table, :column, :data_type, :key, COALESCE(MAX(position), 0) + 1, :created
+    FROM column_registry
+    WHERE table_name = :table
+""")
+
+DROP_SQL = text("""
+    DELETE FROM column_registry WHERE table_name = :table AND column_name = :column
+""")
+
+RENAME_SQL = text("""
+    UPDATE column_registry SET column_name = :new
+    WHERE table_name = :table AND column_name = :old
+""")
+
+# ALTER TABLE type -> information_schema data_type, as /columns reports it
+DATA_TYPES = {
+    "VARCHAR": "character varying",
+    "INTEGER": "integer",
+    "BOOLEAN": "boolean",
+}
+
+PG_CASTS = {"integer": "INTEGER", "boolean": "BOOLEAN"}
+
+
+# --------------------------
+# Column Registry
+# --------------------------
+def add_column(conn, table, column, sql_type):
+    if column == ATTRIBUTES:
+        raise HTTPException(status_code=400, detail=f"'{ATTRIBUTES}' is a reserved column name")
+
+    conn.execute(ADD_SQL, {
+        "table": table,
+        "column": column,
+        "data_type": DATA_TYPES[sql_type],
+        "key": f"c{secrets.token_hex(6)}",
+        "created": datetime.now().isoformat()
+    })
+
+
+def drop_column(conn, table, column):
+    conn.execute(DROP_SQL, {"table": table, "column": column})
+
+
+def rename_column(conn, table, old, new):
+    conn.execute(RENAME_SQL, {"table": table, "old": old, "new": new})
+
+
+# --------------------------
+# SQL Expressions
+# --------------------------
+# Storage keys are generated above ("c" + hex), so they are safe to
+# inline into SQL.
+
+def read_sql(dialect, key, data_type):
+    """Expression reading one attribute with its column type."""
+    if dialect == "postgresql":
+        raw = f"({ATTRIBUTES} ->> '{key}')"
+        cast = PG_CASTS.get(data_type)
+        return f"CAST({raw} AS {cast})" if cast else raw
+    return f"json_extract({ATTRIBUTES}, '$.{key}')"
+
+
+def document_sql(dialect, param):
+    """A bound JSON document, as the attributes column type."""
+    if dialect == "postgresql":
+        return f"CAST(:{param} AS JSONB)"
+    return f"json(:{param})"
+
+
+def merge_sql(dialect, param):
+    """The attributes document with the keys of a bound document replaced."""
+    if dialect == "postgresql":
+        return f"{ATTRIBUTES} || {document_sql(dialect, param)}"
+    return f"json_patch({ATTRIBUTES}, :{param})"
+
+
+def equals_sql(dialect, key, data_type, param, value):
+    """
+    (clause, bound value) for attribute = value, value already coerced.
+    On PostgreSQL this is a containment test, which the GIN index answers.
+    """
+    if dialect == "postgresql":
+        return f"{ATTRIBUTES} @> {document_sql(dialect, param)}", json.dumps({key: value})
+    return f"{read_sql(dialect, key, data_type)} = :{param}", value
+
+
+def coerce(value, data_type, column):
+    """Convert an incoming value to the JSON type of its column."""
+    if value is None:
+        return None
+    try:
+        if data_type == "integer":
+            return None if value == "" else int(value)
+        if data_type == "boolean":
+            if isinstance(value, str):
+                if value == "":
+                    return None
+                return value.strip().lower() in ("true", "t", "1", "yes", "on")
+            return bool(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid {data_type} value for column '{column}'")
+    return value if isinstance(value, str) else str(value)
+
+
+# --------------------------
+# Storage Setup
+# --------------------------
+def ensure_columns(engine, tables):
+    """
+    Add the attributes column to tables that do not have it. The constant
+    default makes this a catalogue-only change on PostgreSQL 11+.
+    """
+    postgres = engine.dialect.name == "postgresql"
+    column_type = "JSONB" if postgres else "TEXT"
+
+    with autocommit(engine) as conn:
+        inspector = inspect(conn)
+        for table in tables:
+            columns = {col["name"] for col in inspector.get_columns(table)}
+            if ATTRIBUTES not in columns:
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN {ATTRIBUTES} {column_type} NOT NULL DEFAULT '{{}}'"
+                ))
+                logger.info("Attributes column added to %s", table)
+
+
+def ensure_indexes(engine, tables):
+    """GIN index on each attributes column (PostgreSQL), built concurrently."""
+    if engine.dialect.name != "postgresql":
+        return
+
+    start = time.perf_counter()
+    try:
+        with autocommit(engine) as conn:
+            for table in tables:
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{ATTRIBUTES} "
+                    f"ON {table} USING GIN ({ATTRIBUTES} jsonb_path_ops)"
+                ))
+    except SQLAlchemyError as e:
+        logger.error("Attributes index creation failed: %s", e)
+        return
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info("Attributes indexes checked in %.1f ms", elapsed_ms)
@@ -0,0 +1,237 @@
+"""
+Batch quotation document generation.
+
+Renders many quotations through the global template across a process
+pool and streams the HTML documents into a ZIP as they finish. Used by
+POST /quotation-with-items/render-batch and as a CLI, run from backend/:
+
+    python batch_render.py --all --out quotations.zip
+    python batch_render.py --ids 1,2,3 --workers 8 --out some.zip
+    python batch_render.py --filter customer_code=C042 --out c042.zip
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sqlalchemy import bindparam, text
+
+import quotation_store
+import rendering
+import settings
+import template_store
+from database import engine, schema
+from listing import PageQuery
+
+
+def quotations_by_id_sql():
+    return text(f"""
+        SELECT {schema.select_sql("quotation")} FROM quotation WHERE id IN :qids ORDER BY id
+    """).bindparams(bindparam("qids", expanding=True))
+
+
+# --------------------------
+# Shared Process Pool
+# --------------------------
+# Workers are never forked straight from the server: by then it has
+# threads (request threadpool, log listener, index management) and open
+# pooled connections, and a forked child would inherit held locks and
+# live sockets. "forkserver" forks them from a clean helper process
+# instead; "spawn" starts fresh interpreters where forkserver is missing.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_pool():
+    """Process pool for the API, started from the app's lifespan."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.RENDER_WORKERS, mp_context=pool_context())
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+# --------------------------
+# Data Fetching
+# --------------------------
+def select_ids(conn, filters=None):
+    """Quotation ids matching ?column=value / column__prefix=value filters."""
+    page = PageQuery("quotation", schema.column_names("quotation"), filters or {})
+    return list(conn.execute(page.statement(select="id"), page.params).scalars())
+
+
+def fetch_chunk(conn, quotation_ids):
+    """[(quotation, items), ...] for a chunk of ids, in two statements."""
+    quotations = [
+        dict(row._mapping)
+        for row in conn.execute(quotations_by_id_sql(), {"qids": quotation_ids})
+    ]
+    items_by_quotation = quotation_store.items_for_quotations(conn, quotation_ids)
+    return [(q, items_by_quotation.get(q["id"], [])) for q in quotations]
+
+
+# --------------------------
+# Rendering
+# --------------------------
+def render_chunks(pool, version, template, item_columns, chunks, workers):
+    """
+    Submit chunks of (quotation, items) to the pool and yield
+    (quotation_id, html) as each chunk finishes. At most two chunks per
+    worker are in flight, so memory stays bounded for large batches.
+    """
+    max_in_flight = workers * 2
+    pending = set()
+
+    for chunk in chunks:
+        if len(pending) >= max_in_flight:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+        pending.add(pool.submit(rendering.render_chunk, version, template, item_columns, chunk))
+
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            yield from future.result()
+
+
+def render_batch(quotation_ids, base_url, pool, workers, chunk_size=None, progress=None):
+    """
+    Fetch quotations in chunks and yield (quotation_id, html) in
+    completion order. progress(done, total) is called after every document.
+    """
+    chunk_size = chunk_size or settings.RENDER_CHUNK_SIZE
+    total = len(quotation_ids)
+
+    with engine.connect() as conn:
+        stored_version = template_store.version(conn)
+        template = template_store.load(conn, stored_version, base_url)
+        item_columns = schema.column_names("items")
+        version = (stored_version, schema.table_version("items"), base_url)
+
+        chunks = (
+            fetch_chunk(conn, quotation_ids[i:i + chunk_size])
+            for i in range(0, total, chunk_size)
+        )
+        for done, document in enumerate(
+            render_chunks(pool, version, template, item_columns, chunks, workers), start=1
+        ):
+            yield document
+            if progress:
+                progress(done, total)
+
+
+# --------------------------
+# ZIP Streaming
+# --------------------------
+class ZipChunks(io.RawIOBase):
+    """Unseekable sink that hands the written ZIP bytes back in pieces."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_documents(documents, requested_ids=None):
+    """
+    Yield a ZIP archive, one piece per document, as documents arrive.
+    A manifest.json with counts and timing is written last.
+    """
+    start = time.perf_counter()
+    rendered = []
+    buffer = ZipChunks()
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for quotation_id, document in documents:
+            archive.writestr(f"quotation_{quotation_id}.html", document)
+            rendered.append(quotation_id)
+            yield buffer.drain()
+
+        missing = sorted(set(requested_ids or []) - set(rendered))
+        archive.writestr("manifest.json", json.dumps({
+            "documents": len(rendered),
+            "missing_ids": missing,
+            "elapsed_s": round(time.perf_counter() - start, 3)
+        }, indent=2))
+
+    yield buffer.drain()
+
+
+# --------------------------
+# CLI
+# --------------------------
+def progress_printer():
+    """progress() callback that reports count and rate on stderr."""
+    start = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        print(f"\rrendered {done}/{total} ({rate:.1f} docs/s)", end="", file=sys.stderr, flush=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render quotations to HTML documents in a ZIP")
+    which = parser.add_mutually_exclusive_group(required=True)
+    which.add_argument("--ids", help="comma-separated quotation ids")
+    which.add_argument("--all", action="store_true", help="every quotation")
+    which.add_argument("--filter", action="append", metavar="COLUMN=VALUE",
+                       help="column filter, e.g. customer_code=C042 or customer_name__prefix=Ac")
+    parser.add_argument("--out", default="quotations.zip")
+    parser.add_argument("--workers", type=int, default=settings.RENDER_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=settings.RENDER_CHUNK_SIZE)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/",
+                        help="API address used for image URLs in the documents")
+    args = parser.parse_args()
+
+    if args.ids:
+        quotation_ids = [int(qid) for qid in args.ids.split(",")]
+    else:
+        filters = dict(f.split("=", 1) for f in args.filter or [])
+        with engine.connect() as conn:
+            quotation_ids = select_ids(conn, filters)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=pool_context()) as pool, open(args.out, "wb") as out:
+        documents = render_batch(
+            quotation_ids, args.base_url, pool, args.workers, args.chunk_size, progress_printer()
+        )
+        for piece in zip_documents(documents, quotation_ids):
+            out.write(piece)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nwrote {args.out}: {len(quotation_ids)} quotations in {elapsed:.2f}s "
+          f"with {args.workers} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Batch rendering throughput (documents/s) against process pool size.
+
+Run from backend/:
+
+    python -m benchmarks.batch_render --documents 2000 --items 20 --workers 1,2,4,8
+
+Renders synthetic quotations through a representative template and
+writes them into an in-memory ZIP, so it measures the render + archive
+path only (no database). Prints one JSON object per worker count.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_render import pool_context, render_chunks, zip_documents
+
+
+TEMPLATE = [
+    {"type": "header", "value": "QUOTATION", "fontSize": 24, "fontWeight": "bold", "textAlign": "center"},
+    {"type": "field", "label": "Customer", "fieldKey": "customer_name"},
+    {"type": "field", "label": "Customer Code", "fieldKey": "customer_code"},
+    {"type": "field", "label": "Enquiry Ref", "fieldKey": "enquiry_ref"},
+    {"type": "divider"},
+    {"type": "table", "fontSize": 12},
+    {"type": "total", "fontSize": 14},
+    {"type": "text", "value": "Terms: payment within 30 days.\nPrices exclude GST."},
+]
+
+ITEM_COLUMNS = [
+    "id", "quotation_id", "sample_activity", "specification", "hsn_sac_code",
+    "qty", "unit", "unit_rate", "total_cost"
+]
+
+
+def make_chunks(documents, items, chunk_size):
+    chunk = []
+    for qid in range(1, documents + 1):
+        quotation = {
+            "id": qid,
+            "customer_name": f"Customer {qid}",
+            "customer_code": f"C{qid:05d}",
+            "enquiry_ref": f"ENQ-{qid}"
+        }
+        lines = [
+            {
+                "id": qid * 1000 + i,
+                "quotation_id": qid,
+                "sample_activity": f"Activity {i} <test>",
+                "specification": "IS 456 & IS 10262",
+                "hsn_sac_code": "998346",
+                "qty": i + 1,
+                "unit": "nos",
+                "unit_rate": 250,
+                "total_cost": 250 * (i + 1)
+            }
+            for i in range(items)
+        ]
+        chunk.append((quotation, lines))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bench(workers, documents, items, chunk_size):
+    version = ("benchmark", workers)
+    size = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        # Start the workers before timing
+        list(pool.map(abs, range(workers)))
+
+        start = time.perf_counter()
+        rendered = render_chunks(
+            pool, version, TEMPLATE, ITEM_COLUMNS,
+            make_chunks(documents, items, chunk_size), workers
+        )
+        for piece in zip_documents(rendered):
+            size += len(piece)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "workers": workers,
+        "documents": documents,
+        "items_per_document": items,
+        "chunk_size": chunk_size,
+        "elapsed_s": round(elapsed, 3),
+        "docs_per_s": round(documents / elapsed, 1),
+        "zip_bytes": size
+    }
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus})
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--workers", default=",".join(str(w) for w in default_workers),
+                        help="comma-separated pool sizes")
+    args = parser.parse_args()
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        print(json.dumps(bench(workers, args.documents, args.items, args.chunk_size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-quotation latency of POST /quotation-with-items against line count.
+
+Run from backend/:
+
+    python -m benchmarks.create_quotation --lines 1,10,100,300,500 --repeat 20
+
+Uses the database configured by DATABASE_URL (settings.py) and deletes
+every quotation it creates. Prints one JSON object per line count.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def make_payload(lines):
+    return {
+        "quotation_data": {"customer_name": "benchmark"},
+        "items_data": [
+            {
+                "sample_activity": f"Line {i}",
+                "specification": "bench",
+                "qty": 1,
+                "unit": "nos",
+                "unit_rate": 100,
+                "total_cost": 100
+            }
+            for i in range(lines)
+        ]
+    }
+
+
+def bench(client, lines, repeat):
+    payload = make_payload(lines)
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resp = client.post("/quotation-with-items", json=payload)
+        timings.append((time.perf_counter() - start) * 1000)
+        resp.raise_for_status()
+        client.delete(f"/quotation-with-items/{resp.json()['quotation_id']}")
+
+    median = statistics.median(timings)
+    return {
+        "lines": lines,
+        "repeat": repeat,
+        "p50_ms": round(median, 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "per_line_ms": round(median / lines, 4) if lines else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", default="1,10,50,100,300,500")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        for lines in (int(n) for n in args.lines.split(",")):
+            print(json.dumps(bench(client, lines, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
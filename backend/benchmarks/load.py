@@ -0,0 +1,275 @@
+"""
+Latency and throughput of the API endpoints at a fixed concurrency.
+
+Run from backend/, after seeding (python -m benchmarks.seed):
+
+    python -m benchmarks.load --concurrency 8 --requests 500
+    python -m benchmarks.load --scenarios get_quotation,update_quotation --concurrency 32
+    python -m benchmarks.load --url http://localhost:8000 --concurrency 64
+
+Without --url the app runs in-process (httpx ASGITransport, lifespan
+included) against the configured database; with --url a running server
+is driven instead. Each scenario sends --requests requests from
+--concurrency concurrent clients after --warmup untimed ones, and prints
+one JSON object: p50/p95/p99/max latency, throughput, errors, and SQL
+statements and DB time per request (read from the Server-Timing header,
+so REQUEST_STATS must be on). Scenarios that write clean up after
+themselves, outside the timed section.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+
+import httpx
+
+
+SERVER_TIMING_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) statements"')
+
+ITEM_LINES = 10
+
+
+def quotation_payload(i, lines=ITEM_LINES):
+    return {
+        "quotation_data": {"customer_name": f"Load test {i}", "customer_code": "LOAD"},
+        "items_data": [
+            {
+                "sample_activity": f"Line {n}",
+                "specification": "load test",
+                "qty": 1,
+                "unit": "nos",
+                "unit_rate": 100,
+                "total_cost": 100
+            }
+            for n in range(lines)
+        ]
+    }
+
+
+# --------------------------
+# Scenarios
+# --------------------------
+# request(client, state, i) sends the i-th timed request. setup and
+# teardown run untimed; setup gets the number of requests to prepare for.
+
+class Scenario:
+    def __init__(self, name, request, setup=None, teardown=None):
+        self.name = name
+        self.request = request
+        self.setup = setup
+        self.teardown = teardown
+
+
+async def sample_ids(client, state, count):
+    """Ids of existing quotations and charge name prefixes to pick from."""
+    ids = set()
+    for sort in ("id", "-id"):
+        resp = await client.get("/quotation", params={"fields": "id", "limit": 1000, "sort": sort})
+        resp.raise_for_status()
+        ids.update(row["id"] for row in resp.json())
+    if not ids:
+        raise SystemExit("No quotations found; seed the database first (python -m benchmarks.seed)")
+    state["ids"] = sorted(ids)
+
+    resp = await client.get("/charges", params={"fields": "name", "limit": 500})
+    resp.raise_for_status()
+    names = [row["name"] for row in resp.json() if row.get("name")]
+    state["terms"] = [name[:length] for name in names for length in (2, 4)] or ["te"]
+
+
+async def create_targets(client, state, count):
+    """Quotations for the update/delete scenarios, created untimed."""
+    await sample_ids(client, state, count)
+    state["created"] = []
+    for i in range(count):
+        resp = await client.post("/quotation-with-items", json=quotation_payload(i))
+        resp.raise_for_status()
+        state["created"].append(resp.json()["quotation_id"])
+
+
+async def delete_created(client, state):
+    for quotation_id in state.get("created", []):
+        await client.delete(f"/quotation-with-items/{quotation_id}")
+
+
+async def add_column_names(client, state, count):
+    state["columns"] = [f"load_col_{random.randrange(1 << 30)}_{i}" for i in range(count)]
+
+
+async def drop_columns(client, state):
+    for name in state["columns"]:
+        await client.post("/items/delete-column", json={"column_name": name})
+
+
+def random_id(state):
+    return random.choice(state["ids"])
+
+
+async def post_created(client, state, i):
+    resp = await client.post("/quotation-with-items", json=quotation_payload(i))
+    if resp.status_code == 200:
+        state.setdefault("created", []).append(resp.json()["quotation_id"])
+    return resp
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario("list_charges", lambda c, s, i: c.get("/charges", params={"limit": 100})),
+        Scenario("list_quotation", lambda c, s, i: c.get("/quotation", params={"limit": 100})),
+        Scenario("list_items", lambda c, s, i: c.get("/items", params={"limit": 100})),
+        Scenario(
+            "list_quotation_with_items",
+            lambda c, s, i: c.get("/quotation-with-items", params={"limit": 50})
+        ),
+        Scenario(
+            "search_charges",
+            lambda c, s, i: c.get("/charges/search", params={"q": random.choice(s["terms"])}),
+            setup=sample_ids
+        ),
+        Scenario(
+            "get_quotation",
+            lambda c, s, i: c.get(f"/quotation-with-items/{random_id(s)}"),
+            setup=sample_ids
+        ),
+        Scenario("create_quotation", post_created, teardown=delete_created),
+        Scenario(
+            "update_quotation",
+            lambda c, s, i: c.put(
+                f"/quotation-with-items/{s['created'][i]}",
+                json={
+                    "quotation_data": {"customer_name": f"Updated {i}"},
+                    "items_data": [{"sample_activity": "Added line", "qty": 1}]
+                }
+            ),
+            setup=create_targets, teardown=delete_created
+        ),
+        Scenario(
+            "delete_quotation",
+            lambda c, s, i: c.delete(f"/quotation-with-items/{s['created'][i]}"),
+            setup=create_targets
+        ),
+        Scenario(
+            "update_field",
+            lambda c, s, i: c.put("/quotation/update-field", json={
+                "quotation_id": random_id(s), "column_name": "payment_terms", "value": f"{i % 90} days"
+            }),
+            setup=sample_ids
+        ),
+        Scenario(
+            "add_column",
+            lambda c, s, i: c.post("/items/add-column", json={"column_name": s["columns"][i]}),
+            setup=add_column_names, teardown=drop_columns
+        ),
+    ]
+}
+
+# Column DDL is opt-in: it is slow by nature and blocks other writers
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "add_column"]
+
+
+# --------------------------
+# Runner
+# --------------------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run(client, scenario, concurrency, requests, warmup):
+    state = {}
+    if scenario.setup:
+        await scenario.setup(client, state, requests + warmup)
+
+    latencies = []
+    statements = []
+    db_ms = []
+    errors = 0
+    next_index = iter(range(requests + warmup))
+
+    async def worker():
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            resp = await scenario.request(client, state, i)
+            elapsed = time.perf_counter() - start
+            if i < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            if resp.status_code >= 400:
+                errors += 1
+            timing = SERVER_TIMING_RE.search(resp.headers.get("server-timing", ""))
+            if timing:
+                db_ms.append(float(timing.group(1)))
+                statements.append(int(timing.group(2)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    if scenario.teardown:
+        await scenario.teardown(client, state)
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "statements_per_request": round(statistics.mean(statements), 2) if statements else None,
+        "db_ms_per_request": round(statistics.mean(db_ms), 2) if db_ms else None,
+    }
+
+
+async def run_all(args):
+    names = args.scenarios.split(",") if args.scenarios else DEFAULT_SCENARIOS
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            for name in names:
+                print(json.dumps({"target": args.url, **await run(
+                    client, SCENARIOS[name], args.concurrency, args.requests, args.warmup
+                )}), flush=True)
+        return
+
+    # Imported here so --url runs do not need the database settings
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as client:
+            for name in names:
+                print(json.dumps({"target": "in-process", **await run(
+                    client, SCENARIOS[name], args.concurrency, args.requests, args.warmup
+                )}), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in-process)")
+    parser.add_argument("--scenarios", help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Fill the configured database with synthetic charges, quotations and items.
+
+Run from backend/:
+
+    python -m benchmarks.seed --quotations 10000 --items 1-20 --charges 500
+
+Each quotation gets a uniformly random number of item lines within
+--items ("5" for exactly five). --seed makes the data repeatable. Rows are
+inserted with multi-row INSERTs, --batch quotations per transaction, so
+1M quotations is practical on PostgreSQL. --clear empties the three
+tables first. Prints one JSON summary line.
+"""
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import text
+
+import dialects
+from database import engine, schema
+from main import bootstrap_schema, charges_table, items_table, quotation_table
+
+
+UNITS = ["nos", "kg", "m", "set", "sample"]
+ACTIVITIES = [
+    "Compressive strength", "Soil pH test", "Water absorption", "Sieve analysis",
+    "Tensile test", "Chloride content", "Moisture content", "Slump test"
+]
+
+
+def parse_range(value):
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def physical_columns(table):
+    """Columns of `table` the database has, so seeding survives column DDL."""
+    existing = set(schema.column_names(table.name))
+    return [col.name for col in table.columns if col.name in existing and col.name != "id"]
+
+
+def keep(row, columns):
+    return {col: row[col] for col in columns}
+
+
+def charge_row(n, rng):
+    return {
+        "name": f"{rng.choice(ACTIVITIES)} {n}",
+        "specification": f"IS {rng.randint(100, 20000)}",
+        "charge_amount": rng.randint(100, 10000)
+    }
+
+
+def quotation_row(n, rng):
+    return {
+        "customer_name": f"Customer {n}",
+        "contact_person": f"Contact {n % 997}",
+        "designation": "Engineer",
+        "department": rng.choice(["Quality", "Projects", "Purchase"]),
+        "mobile_number": f"9{rng.randint(100000000, 999999999)}",
+        "email_id": f"customer{n}@example.com",
+        "customer_code": f"C{n % 5000:05d}",
+        "gst_details": "29ABCDE1234F1Z5",
+        "enquiry_ref": f"ENQ-{n}",
+        "enquiry_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "payment_terms": "30 days",
+        "ot_charges": "As applicable",
+        "delivery_period": f"{rng.randint(1, 30)} days",
+        "place_of_work": "Site",
+        "terms_condition_1": "Prices exclude GST.",
+        "terms_condition_2": "Samples are retained for 30 days.",
+        "no_person_visiting_1": str(rng.randint(1, 4)),
+        "no_person_visiting_2": str(rng.randint(0, 2))
+    }
+
+
+def item_row(quotation_id, i, rng):
+    qty = rng.randint(1, 20)
+    rate = rng.randint(100, 5000)
+    return {
+        "quotation_id": quotation_id,
+        "sample_activity": rng.choice(ACTIVITIES),
+        "specification": f"Line {i}",
+        "hsn_sac_code": "998346",
+        "qty": qty,
+        "unit": rng.choice(UNITS),
+        "unit_rate": rate,
+        "total_cost": qty * rate
+    }
+
+
+def clear():
+    with engine.begin() as conn:
+        for table in ("items", "quotation", "charges"):
+            conn.execute(text(f"DELETE FROM {table}"))
+
+
+def seed_charges(count, rng):
+    columns = physical_columns(charges_table)
+    with engine.begin() as conn:
+        if count:
+            conn.execute(charges_table.insert(), [keep(charge_row(n, rng), columns) for n in range(count)])
+
+
+def seed_quotations(count, items, batch, rng):
+    quotation_columns = physical_columns(quotation_table)
+    item_columns = physical_columns(items_table)
+    total_items = 0
+    for start in range(0, count, batch):
+        rows = [keep(quotation_row(n, rng), quotation_columns) for n in range(start, min(start + batch, count))]
+        with engine.begin() as conn:
+            ids = dialects.insert_ids(conn, quotation_table, rows)
+            lines = [
+                keep(item_row(qid, i, rng), item_columns)
+                for qid in ids
+                for i in range(rng.randint(*items))
+            ]
+            if lines:
+                conn.execute(items_table.insert(), lines)
+        total_items += len(lines)
+    return total_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotations", type=int, default=1000)
+    parser.add_argument("--items", default="1-20", help="item lines per quotation, N or MIN-MAX")
+    parser.add_argument("--charges", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1000, help="quotations per transaction")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clear", action="store_true", help="delete existing rows first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bootstrap_schema()
+    if args.clear:
+        clear()
+
+    start = time.perf_counter()
+    seed_charges(args.charges, rng)
+    items = seed_quotations(args.quotations, parse_range(args.items), args.batch, rng)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "database": engine.dialect.name,
+        "charges": args.charges,
+        "quotations": args.quotations,
+        "items": items,
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round((args.charges + args.quotations + items) / elapsed, 1)
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Serialization time and bytes on the wire for a GET /quotation-with-items
+body, old path against new.
+
+Run from backend/:
+
+    python -m benchmarks.serialization --quotations 10000 --items 5 --repeat 3
+
+Builds the result of quotation_store.fetch_all for synthetic quotations
+(no database) and encodes it the way each path does:
+
+  * "stdlib": FastAPI's default, jsonable_encoder then json.dumps
+  * "fast": json_response, serialization.dumps (orjson when installed)
+
+then compresses the body with gzip (and brotli, when installed) at the
+configured levels. Prints one JSON object per path.
+"""
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import settings
+from compression import brotli
+from serialization import json_response, orjson
+
+
+def make_result(quotations, items):
+    return [
+        {
+            "quotation": {
+                "id": qid,
+                "customer_name": f"Customer {qid}",
+                "contact_person": "A. Kumar",
+                "designation": "Lab Manager",
+                "department": "Quality",
+                "mobile_number": "9876543210",
+                "email_id": f"customer{qid}@example.com",
+                "customer_code": f"C{qid:06d}",
+                "gst_details": "29ABCDE1234F1Z5",
+                "enquiry_ref": f"ENQ-{qid}",
+                "enquiry_date": "2024-05-01",
+                "payment_terms": "30 days"
+            },
+            "items": [
+                {
+                    "id": qid * 1000 + i,
+                    "quotation_id": qid,
+                    "sample_activity": f"Activity {i}",
+                    "specification": "IS 456 & IS 10262",
+                    "hsn_sac_code": "998346",
+                    "qty": i + 1,
+                    "unit": "nos",
+                    "unit_rate": 250,
+                    "total_cost": 250 * (i + 1)
+                }
+                for i in range(items)
+            ]
+        }
+        for qid in range(1, quotations + 1)
+    ]
+
+
+def stdlib_body(result):
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def fast_body(result):
+    return json_response(result).body
+
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def bench(name, encode, result, repeat):
+    body, encode_s = best_time(lambda: encode(result), repeat)
+    gzipped, gzip_s = best_time(
+        lambda: gzip.compress(body, compresslevel=settings.GZIP_LEVEL), repeat
+    )
+    report = {
+        "path": name,
+        "encoder": "orjson" if name == "fast" and orjson is not None else "json",
+        "encode_ms": round(encode_s * 1000, 1),
+        "bytes": len(body),
+        "gzip_ms": round(gzip_s * 1000, 1),
+        "gzip_bytes": len(gzipped),
+    }
+    if brotli is not None:
+        compressed, brotli_s = best_time(
+            lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY), repeat
+        )
+        report["brotli_ms"] = round(brotli_s * 1000, 1)
+        report["brotli_bytes"] = len(compressed)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quotations", type=int, default=10000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = make_result(args.quotations, args.items)
+    for name, encode in (("stdlib", stdlib_body), ("fast", fast_body)):
+        report = bench(name, encode, result, args.repeat)
+        report.update(quotations=args.quotations, items_per_quotation=args.items)
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import text
+
+import settings
+
+
+# ============================================================
+#         CHARGE SEARCH (in-memory n-gram index)
+# ============================================================
+# Results are ranked in tiers: names starting with the query, then names
+# with a word starting with it (both alphabetical), then any other
+# substring match in catalogue (id) order. The first two tiers are slices of sorted lists (found
+# by bisection), so common type-ahead queries stop after `limit` entries.
+# The last tier uses an n-gram index: every 1-, 2- and 3-character
+# substring of a name maps to the sorted ids of the names containing it.
+# A query walks the shortest posting list of its grams, confirming the
+# match, until it has enough results.
+#
+# Row writes update the index in place once their transaction has
+# committed, so a rollback never leaves the index serving rows that do
+# not exist. Column DDL or an index older than CHARGE_SEARCH_MAX_AGE
+# (writes from other processes) makes the next search start a rebuild in
+# a background thread. Searches keep using the current index until the
+# new one is swapped in; only the very first search waits for a build.
+# Rebuilds and row updates take turns: a row update waits for a rebuild
+# in progress and is applied to the new index, rather than being lost
+# when the index read before its commit is swapped in.
+
+GRAM_SIZE = 3
+
+# Upper bound for ?limit= on /charges/search
+MAX_SEARCH_RESULTS = 100
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize(value):
+    return " ".join(str(value or "").split()).casefold()
+
+
+def grams(term):
+    """The n-grams a query needs; the term itself when it is short."""
+    if len(term) <= GRAM_SIZE:
+        return {term}
+    return {term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+
+
+def all_grams(name):
+    """Every substring of up to GRAM_SIZE characters, for indexing."""
+    return {
+        name[i:i + size]
+        for size in range(1, GRAM_SIZE + 1)
+        for i in range(len(name) - size + 1)
+    }
+
+
+def word_suffixes(name):
+    """The name from each later word onwards: "soil ph test" -> "ph test", "test"."""
+    return [name[m.start():] for m in WORD_RE.finditer(name) if m.start() > 0]
+
+
+def prefix_matches(entries, term):
+    """(key, id) entries of a sorted list whose key starts with term, in order."""
+    i = bisect_left(entries, (term,))
+    while i < len(entries) and entries[i][0].startswith(term):
+        yield entries[i][1]
+        i += 1
+
+
+class ChargeIndex:
+    def __init__(self, engine, schema):
+        self.engine = engine
+        self.schema = schema
+        # Guards the index structures (searches and swaps)
+        self._lock = threading.Lock()
+        # Serializes rebuilds against row updates
+        self._write_lock = threading.Lock()
+        self._rows = {}
+        self._names = {}
+        self._postings = {}
+        self._by_name = []
+        self._by_word = []
+        self._built_at = None
+        # Set by invalidate(): rebuild regardless of age
+        self._dirty = False
+        self._rebuilding = False
+        self.builds = 0
+
+    # --------------------------
+    # Maintenance
+    # --------------------------
+    def _add(self, row):
+        charge_id = row["id"]
+        name = normalize(row.get("name"))
+        self._rows[charge_id] = row
+        self._names[charge_id] = name
+        insort(self._by_name, (name, charge_id))
+        for suffix in word_suffixes(name):
+            insort(self._by_word, (suffix, charge_id))
+        for gram in all_grams(name):
+            insort(self._postings.setdefault(gram, []), charge_id)
+
+    def _remove(self, charge_id):
+        self._rows.pop(charge_id, None)
+        name = self._names.pop(charge_id, None)
+        if name is None:
+            return
+        self._by_name.remove((name, charge_id))
+        for suffix in word_suffixes(name):
+            self._by_word.remove((suffix, charge_id))
+        for gram in all_grams(name):
+            posting = self._postings[gram]
+            del posting[bisect_left(posting, charge_id)]
+            if not posting:
+                del self._postings[gram]
+
+    def _stale(self):
+        return (
+            self._built_at is None
+            or self._dirty
+            or time.monotonic() - self._built_at > settings.CHARGE_SEARCH_MAX_AGE
+        )
+
+    def rebuild(self):
+        with self._write_lock:
+            # Another request may have rebuilt it while this one waited
+            if not self._stale():
+                return
+            self._rebuild()
+
+    def rebuild_in_background(self):
+        """Start a rebuild thread unless one is already running."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._background_rebuild, name="charge-index-rebuild", daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # The current index stays in use; the next search tries again
+            logger.exception("charge index rebuild failed")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild(self):
+        # An invalidate() from here on marks the new index stale as well
+        with self._lock:
+            self._dirty = False
+        with self.engine.connect() as conn:
+            all_sql = text(f"SELECT {self.schema.select_sql('charges')} FROM charges")
+            rows = [dict(row._mapping) for row in conn.execute(all_sql)]
+
+        with self._lock:
+            self._rows = {row["id"]: row for row in rows}
+            self._names = {cid: normalize(row.get("name")) for cid, row in self._rows.items()}
+            self._by_name = sorted((name, cid) for cid, name in self._names.items())
+            self._by_word = sorted(
+                (suffix, cid)
+                for cid, name in self._names.items()
+                for suffix in word_suffixes(name)
+            )
+            self._postings = {}
+            for cid in sorted(self._names):
+                for gram in all_grams(self._names[cid]):
+                    self._postings.setdefault(gram, []).append(cid)
+            self._built_at = time.monotonic()
+            self.builds += 1
+
+    def read(self, conn, charge_id):
+        """
+        One charge as the index stores it (None if it is gone). Read it
+        inside the writing transaction and put() it after the commit.
+        """
+        charge_sql = text(f"SELECT {self.schema.select_sql('charges')} FROM charges WHERE id = :cid")
+        row = conn.execute(charge_sql, {"cid": charge_id}).fetchone()
+        return dict(row._mapping) if row is not None else None
+
+    def put(self, charge_id, row):
+        """Replace one committed charge (None removes it)."""
+        with self._write_lock:
+            if self._built_at is None:
+                return
+
+            with self._lock:
+                self._remove(charge_id)
+                if row is not None:
+                    self._add(row)
+
+    def invalidate(self):
+        """Rebuild on the next search, e.g. after the columns change."""
+        with self._lock:
+            self._dirty = True
+
+    # --------------------------
+    # Search
+    # --------------------------
+    def search(self, q, limit):
+        """Top `limit` charges whose name contains q, best match first."""
+        if self._built_at is None:
+            # Nothing to serve until the first build
+            self.rebuild()
+        elif self._stale():
+            self.rebuild_in_background()
+
+        term = normalize(q)
+        with self._lock:
+            found = {}  # insertion-ordered set of ids
+            for cid in prefix_matches(self._by_name, term):
+                found[cid] = None
+                if len(found) == limit:
+                    return self._result(found)
+
+            for cid in prefix_matches(self._by_word, term):
+                found[cid] = None
+                if len(found) == limit:
+                    return self._result(found)
+
+            # Grams of up to GRAM_SIZE characters are exact; longer terms
+            # only share every gram with a name, so confirm the substring
+            posting = min((self._postings.get(gram, ()) for gram in grams(term)), key=len)
+            exact = len(term) <= GRAM_SIZE
+            names = self._names
+            for cid in posting:
+                if cid not in found and (exact or term in names[cid]):
+                    found[cid] = None
+                    if len(found) == limit:
+                        break
+            return self._result(found)
+
+    def _result(self, ids):
+        return [self._rows[cid] for cid in ids]
+
+    def stats(self):
+        return {
+            "charges": len(self._rows),
+            "grams": len(self._postings),
+            "word_entries": len(self._by_word),
+            "builds": self.builds,
+            "rebuilding": self._rebuilding,
+            "age_s": None if self._built_at is None else round(time.monotonic() - self._built_at, 1),
+        }
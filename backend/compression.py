@@ -0,0 +1,94 @@
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+
+# ============================================================
+#         RESPONSE COMPRESSION (brotli / gzip)
+# ============================================================
+# Bodies of at least `minimum_size` bytes are compressed: with brotli when
+# the client accepts it and the brotli package is installed, else with
+# gzip. Streamed responses (NDJSON) are compressed chunk by chunk, and
+# each chunk is flushed (Z_SYNC_FLUSH for gzip, flush() for brotli), so
+# lines still reach the client as they are produced.
+#
+# Responses that set their own Content-Encoding are left alone, and so
+# are EXCLUDED_CONTENT_TYPES: event streams, and bodies that are already
+# compressed (the batch render ZIP).
+
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/zip")
+
+
+def accepted_encodings(headers):
+    return {
+        part.split(";")[0].strip().lower()
+        for part in headers.get("accept-encoding", "").split(",")
+    }
+
+
+class ExcludeTypesMixin:
+    """Pass EXCLUDED_CONTENT_TYPES through uncompressed."""
+
+    async def send_with_compression(self, message):
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(EXCLUDED_CONTENT_TYPES):
+                self.content_type_is_excluded = True
+
+
+class GzipResponder(ExcludeTypesMixin, GZipResponder):
+    def apply_compression(self, body, *, more_body):
+        if not more_body:
+            return super().apply_compression(body, more_body=False)
+
+        # The base class only writes into the gzip stream, so streamed
+        # chunks would sit in the compressor until the response ends
+        self.gzip_file.write(body)
+        self.gzip_file.flush(zlib.Z_SYNC_FLUSH)
+        compressed = self.gzip_buffer.getvalue()
+        self.gzip_buffer.seek(0)
+        self.gzip_buffer.truncate()
+        return compressed
+
+
+class BrotliResponder(ExcludeTypesMixin, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size, quality):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body, *, more_body):
+        compressed = self.compressor.process(body)
+        if more_body:
+            return compressed + self.compressor.flush()
+        return compressed + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=1024, gzip_level=5, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope))
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in accepted:
+            responder = GzipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+# Settings are read when the app is imported, so the database is chosen
+# here first: a throwaway SQLite file for the whole session
+TEST_DB_DIR = tempfile.mkdtemp(prefix="quotation-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}"
+os.environ["DB_MODE"] = "sync"
+os.environ["COLUMN_STORE"] = "columns"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    """A TestClient with the app started (tables created)."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.app) as client:
+        yield client
+
+
+@pytest.fixture
+def tag():
+    """A name prefix unique to the test, so its rows can be filtered out."""
+    return f"t{uuid.uuid4().hex[:8]}"
+
+
+def create_charges(client, rows):
+    """POST each row to /charges and return the new ids in order."""
+    ids = []
+    for row in rows:
+        response = client.post("/charges", json=row)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["created_id"])
+    return ids
+
+
+def all_pages(client, path, params, max_pages=100):
+    """Follow X-Next-Cursor until the last page; returns (rows, page count)."""
+    rows, pages, after = [], 0, None
+    while pages < max_pages:
+        response = client.get(path, params={**params, **({"after": after} if after else {})})
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        pages += 1
+        after = response.headers.get("x-next-cursor")
+        if after is None:
+            return rows, pages
+    raise AssertionError(f"no last page after {max_pages} pages")
+
+
+def scalars(engine, sql, **params):
+    with engine.connect() as conn:
+        return list(conn.execute(text(sql), params).scalars())
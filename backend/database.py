@@ -0,0 +1,240 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+import dialects
+import request_stats
+import settings
+from schema_registry import SchemaRegistry
+
+
+# ============================================================
+#         ENGINE AND CONNECTION POOL
+# ============================================================
+
+class PoolWaitStats:
+    """
+    Checkout counters and time spent waiting for a pooled connection,
+    kept apart from the time spent opening new ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+    def record_connect(self, took):
+        with self._lock:
+            self.connects += 1
+            self.connect_total += took
+            if took > self.connect_max:
+                self.connect_max = took
+
+    def as_dict(self):
+        with self._lock:
+            avg = self.wait_total / self.checkouts if self.checkouts else 0.0
+            connect_avg = self.connect_total / self.connects if self.connects else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(avg * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "connects": self.connects,
+                "connect_total_ms": round(self.connect_total * 1000, 3),
+                "connect_avg_ms": round(connect_avg * 1000, 3),
+                "connect_max_ms": round(self.connect_max * 1000, 3),
+            }
+
+
+# Connect times of the checkout in progress, so _do_get can leave them
+# out of the wait
+_checkout_connects = ContextVar("pool_checkout_connects", default=None)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited. A checkout that
+    opens an overflow connection counts the connect separately.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.wait_stats = PoolWaitStats()
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            took = time.perf_counter() - start
+            self.wait_stats.record_connect(took)
+            connects = _checkout_connects.get()
+            if connects is not None:
+                connects.append(took)
+
+    def _do_get(self):
+        connects = []
+        token = _checkout_connects.set(connects)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            waited = time.perf_counter() - start - sum(connects)
+            self.wait_stats.record(waited, timed_out=True)
+            request_stats.record_pool_wait(waited)
+            raise
+        finally:
+            _checkout_connects.reset(token)
+        waited = time.perf_counter() - start - sum(connects)
+        self.wait_stats.record(waited)
+        request_stats.record_pool_wait(waited)
+        return conn
+
+
+def create_db_engine(url=None):
+    url = url or settings.DATABASE_URL
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **dialects.engine_options(url),
+    )
+    dialects.configure(engine)
+    return engine
+
+
+def warm_up_pool(engine, connections=None):
+    """
+    Open `connections` connections at once and return them to the pool,
+    so they sit idle and ready before the first request arrives.
+    """
+    count = min(
+        settings.DB_POOL_WARMUP if connections is None else connections,
+        settings.DB_POOL_SIZE
+    )
+    opened = []
+    try:
+        for _ in range(count):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+# Async driver used for each backend when DB_MODE=async
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db_engine(url=None):
+    """
+    AsyncEngine over the async driver for the configured database, with
+    the same pool settings as the sync engine.
+    """
+    # Imported here so the async driver is only needed in async mode
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_url(url or settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **dialects.engine_options(url),
+    )
+    dialects.configure(async_engine.sync_engine)
+    return async_engine
+
+
+async def warm_up_async_pool(async_engine, connections=None):
+    count = min(
+        settings.DB_POOL_WARMUP if connections is None else connections,
+        settings.DB_POOL_SIZE
+    )
+    opened = []
+    try:
+        for _ in range(count):
+            opened.append(await async_engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_s": pool.timeout(),
+    }
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
+
+
+# --------------------------
+# Shared Engines
+# --------------------------
+# Pool size, overflow, timeout, pre-ping and recycle come from settings;
+# SQLite connections are tuned in dialects
+engine = create_db_engine()
+
+# Only created in async mode, so the async driver stays optional
+async_engine = create_async_db_engine() if settings.DB_MODE == "async" else None
+
+# Per-request statement counts and DB time (Server-Timing, request log)
+if settings.REQUEST_STATS:
+    request_stats.instrument(engine)
+    if async_engine is not None:
+        request_stats.instrument(async_engine.sync_engine)
+
+# Column metadata for the dynamic tables, served from memory
+schema = SchemaRegistry(
+    engine,
+    attributes=settings.COLUMN_STORE == "attributes",
+    max_age=settings.SCHEMA_CACHE_MAX_AGE,
+)
@@ -0,0 +1,173 @@
+import sqlite3
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.engine import make_url
+
+import settings
+
+
+# ============================================================
+#         DATABASE DIALECTS (PostgreSQL, SQLite)
+# ============================================================
+# The app runs on PostgreSQL or on an embedded SQLite file, chosen by
+# DATABASE_URL ("postgresql://..." or "sqlite:///quotation.db"). Most SQL
+# is shared. What differs lives here:
+#
+#   * reading a table's columns: information_schema on PostgreSQL,
+#     pragma_table_info on SQLite. SQLite's declared types are mapped to
+#     the PostgreSQL data_type names, so /columns and the schema registry
+#     report the same types on both
+#   * bulk inserts that return the new ids in row order (insert_ids).
+#     PostgreSQL sorts multi-row RETURNING itself; SQLite has no implicit
+#     sentinel for that, so the ids are sorted instead
+#   * engine options and per-connection setup. With psycopg2, an
+#     executemany (grouped item updates, bulk cell edits) is sent in pages
+#     of EXECUTEMANY_PAGE_SIZE statements rather than one round trip per
+#     row (INSERTs become multi-row VALUES). SQLite connections are
+#     shared across the threadpool and are tuned when opened: WAL journal
+#     (readers never block the writer), synchronous=NORMAL, a busy
+#     timeout so concurrent writers wait for the lock instead of failing,
+#     foreign keys on, and a larger page cache and mmap
+#
+# JSON expressions for the attributes column branch on the dialect in
+# attribute_store, and index management in indexes.
+
+# Statements per round trip for executemany on psycopg2
+EXECUTEMANY_PAGE_SIZE = 500
+
+# RETURNING (3.35) and ALTER TABLE ... DROP COLUMN (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+POSTGRES_COLUMNS_SQL = text("""
+    SELECT
+        column_name,
+        data_type
+    FROM information_schema.columns
+    WHERE table_name = :table
+    ORDER BY ordinal_position
+""")
+
+SQLITE_COLUMNS_SQL = text("""
+    SELECT name, type FROM pragma_table_info(:table) ORDER BY cid
+""")
+
+# SQLite declared type -> information_schema data_type
+SQLITE_DATA_TYPES = {
+    "INTEGER": "integer",
+    "INT": "integer",
+    "BIGINT": "bigint",
+    "SMALLINT": "smallint",
+    "BOOLEAN": "boolean",
+    "VARCHAR": "character varying",
+    "NVARCHAR": "character varying",
+    "CHAR": "character",
+    "TEXT": "text",
+    "CLOB": "text",
+    "NUMERIC": "numeric",
+    "DECIMAL": "numeric",
+    "FLOAT": "double precision",
+    "REAL": "real",
+    "BLOB": "bytea",
+    "JSON": "json",
+    "DATE": "date",
+    "DATETIME": "timestamp without time zone",
+    "TIMESTAMP": "timestamp without time zone",
+}
+
+
+def backend(url):
+    return make_url(url).get_backend_name()
+
+
+# --------------------------
+# Column Introspection
+# --------------------------
+def sqlite_data_type(declared):
+    """Map a declared type such as VARCHAR(255); unknown ones are lower-cased."""
+    name = declared.split("(")[0].strip().upper()
+    if not name:
+        return "text"
+    return SQLITE_DATA_TYPES.get(name, name.lower())
+
+
+def physical_columns(conn, table):
+    """[(column_name, data_type), ...] of the table, in ordinal order."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(SQLITE_COLUMNS_SQL, {"table": table})
+        return [(row[0], sqlite_data_type(row[1])) for row in rows]
+    return [(row[0], row[1]) for row in conn.execute(POSTGRES_COLUMNS_SQL, {"table": table})]
+
+
+# --------------------------
+# Bulk Inserts
+# --------------------------
+def insert_ids(conn, table, rows):
+    """
+    Insert rows (dicts) into a Table with batched multi-row INSERTs and
+    return the new integer ids in the order of `rows`.
+    """
+    if not rows:
+        return []
+    if conn.dialect.name == "sqlite":
+        # Asking SQLAlchemy for ordered RETURNING here would send one
+        # INSERT per row. An INTEGER PRIMARY KEY gets ascending ids
+        # within a statement (max(id) + 1 per row, under the write lock),
+        # so sorting the returned ids puts them back in row order.
+        return sorted(conn.execute(insert(table).returning(table.c.id), rows).scalars())
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    return list(conn.execute(stmt, rows).scalars())
+
+
+# --------------------------
+# Engine Setup
+# --------------------------
+def sqlite_pragmas():
+    return [
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA temp_store = MEMORY",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+    ]
+
+
+def engine_options(url):
+    """Extra create_engine() arguments for the backend of `url`."""
+    if make_url(url).get_driver_name() == "psycopg2":
+        return {
+            "executemany_mode": "values_plus_batch",
+            "executemany_batch_page_size": EXECUTEMANY_PAGE_SIZE,
+        }
+    if backend(url) != "sqlite":
+        return {}
+    if make_url(url).database in (None, "", ":memory:"):
+        # Every pooled connection would get its own empty database
+        raise ValueError("SQLite needs a database file, e.g. sqlite:///quotation.db")
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {sqlite3.sqlite_version} is too old; "
+            f"{'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is needed"
+        )
+    # Pooled connections are used by whichever threadpool thread checks
+    # them out
+    return {"connect_args": {"check_same_thread": False}}
+
+
+def configure(engine):
+    """Per-connection setup for a sync engine (for async, its sync_engine)."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
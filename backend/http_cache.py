@@ -0,0 +1,68 @@
+import hashlib
+import threading
+
+from fastapi import Response
+
+
+# ============================================================
+#         HTTP CACHING (ETags, conditional GET)
+# ============================================================
+
+# Clients may keep the body but must revalidate it with If-None-Match
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts):
+    """Strong ETag from the given version parts (or body bytes)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def conditional_response(request, etag, body, media_type="application/json", cache_control=REVALIDATE):
+    """
+    304 if the client already holds `etag`, else the body with its ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+class ResponseCache:
+    """
+    Serialized response bodies kept in memory, keyed by whatever
+    identifies their version. Entries for older versions are replaced.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, name, version):
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1], entry[2]
+        return None
+
+    def put(self, name, version, etag, body):
+        with self._lock:
+            self._entries[name] = (version, etag, body)
+        return etag, body
+
+    def clear(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
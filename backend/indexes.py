@@ -0,0 +1,164 @@
+import logging
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+# ============================================================
+#         MANAGED INDEXES AND FOREIGN KEYS
+# ============================================================
+# Indexes and foreign keys are declared on the Table objects in main.py,
+# so create_all builds them with new tables. create_all never alters a
+# table that already exists, so this module brings existing databases up
+# to date without blocking traffic:
+#
+#   * indexes are built with CREATE INDEX CONCURRENTLY (PostgreSQL), which
+#     runs outside a transaction and does not lock out writes; an invalid
+#     index left behind by an interrupted build is dropped and rebuilt
+#   * foreign keys are added NOT VALID (brief lock, no scan) and then
+#     validated, which scans the table without blocking writes
+#
+# Every statement runs under a short lock_timeout, so if a lock cannot
+# be taken quickly the step fails and is retried on the next startup.
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = "5s"
+
+INVALID_INDEX_SQL = text("""
+    SELECT 1
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name AND NOT i.indisvalid
+""")
+
+NOT_VALIDATED_SQL = text("""
+    SELECT 1 FROM pg_constraint WHERE conname = :name AND NOT convalidated
+""")
+
+
+def index_sql(index, concurrently):
+    columns = ", ".join(col.name for col in index.columns)
+    how = "CONCURRENTLY " if concurrently else ""
+    return f"CREATE INDEX {how}IF NOT EXISTS {index.name} ON {index.table.name} ({columns})"
+
+
+def foreign_key_sql(fk):
+    columns = ", ".join(col.name for col in fk.columns)
+    referred = ", ".join(element.column.name for element in fk.elements)
+    on_delete = f" ON DELETE {fk.ondelete}" if fk.ondelete else ""
+    return (
+        f"ALTER TABLE {fk.table.name} ADD CONSTRAINT {fk.name} "
+        f"FOREIGN KEY ({columns}) REFERENCES {fk.referred_table.name} ({referred})"
+        f"{on_delete} NOT VALID"
+    )
+
+
+def autocommit(engine):
+    conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    if engine.dialect.name == "postgresql":
+        conn.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+    return conn
+
+
+def ensure_indexes(engine, tables):
+    """Create declared indexes missing from existing tables. Returns their names."""
+    postgres = engine.dialect.name == "postgresql"
+    created = []
+
+    with autocommit(engine) as conn:
+        inspector = inspect(conn)
+        for table in tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            columns = {col["name"] for col in inspector.get_columns(table.name)}
+
+            for index in table.indexes:
+                # Columns can be dropped or renamed through the DDL endpoints
+                missing = [col.name for col in index.columns if col.name not in columns]
+                if missing:
+                    logger.warning("Index %s skipped: no column %s", index.name, ", ".join(missing))
+                    continue
+
+                if postgres and conn.execute(INVALID_INDEX_SQL, {"name": index.name}).first():
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                    existing.discard(index.name)
+
+                if index.name in existing:
+                    continue
+
+                start = time.perf_counter()
+                conn.execute(text(index_sql(index, concurrently=postgres)))
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                logger.info("Index %s created in %.1f ms", index.name, elapsed_ms)
+                created.append(index.name)
+
+    return created
+
+
+def ensure_foreign_keys(engine, tables):
+    """
+    Add declared foreign keys missing from existing tables. Returns their
+    names. PostgreSQL only: SQLite cannot add a constraint to an existing
+    table.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+
+    added = []
+    with autocommit(engine) as conn:
+        inspector = inspect(conn)
+        for table in tables:
+            existing = {fk["name"] for fk in inspector.get_foreign_keys(table.name)}
+
+            for fk in table.foreign_key_constraints:
+                if fk.name not in existing:
+                    conn.execute(text(foreign_key_sql(fk)))
+                    added.append(fk.name)
+                elif not conn.execute(NOT_VALIDATED_SQL, {"name": fk.name}).first():
+                    continue
+
+                try:
+                    conn.execute(text(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {fk.name}"))
+                    logger.info("Foreign key %s validated", fk.name)
+                except SQLAlchemyError as e:
+                    # Existing rows break the constraint (e.g. orphaned items).
+                    # It is still enforced for new rows; validation is retried
+                    # on every startup until the data is fixed
+                    logger.warning("Foreign key %s not validated: %s", fk.name, e)
+
+    return added
+
+
+def manage(engine, tables):
+    """Bring indexes and foreign keys of existing tables up to date."""
+    start = time.perf_counter()
+    try:
+        created = ensure_indexes(engine, tables)
+        added = ensure_foreign_keys(engine, tables)
+    except SQLAlchemyError as e:
+        logger.error("Index management failed: %s", e)
+        return
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Index management done in %.1f ms (%d indexes created, %d foreign keys added)",
+        elapsed_ms, len(created), len(added)
+    )
+
+
+def status(engine, tables):
+    """Declared indexes and foreign keys of each table and whether they exist."""
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        report = {}
+        for table in tables:
+            indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            foreign_keys = {fk["name"] for fk in inspector.get_foreign_keys(table.name)}
+            report[table.name] = {
+                "indexes": {ix.name: ix.name in indexes for ix in table.indexes},
+                "foreign_keys": {
+                    fk.name: fk.name in foreign_keys for fk in table.foreign_key_constraints
+                },
+            }
+        return report
@@ -0,0 +1,321 @@
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+
+from database import schema
+from serialization import dumps
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for ?format=msgpack
+    msgpack = None
+
+
+# ============================================================
+#         LIST QUERIES (keyset pagination, filters, sorting)
+# ============================================================
+
+MAX_PAGE_SIZE = 1000
+
+# Rows pulled from the server-side cursor per round trip when streaming
+STREAM_BATCH_SIZE = 500
+
+# Query parameters that are never treated as column filters
+RESERVED_PARAMS = {"limit", "after", "sort", "stream", "fields", "item_fields", "format"}
+
+PREFIX_SUFFIX = "__prefix"
+
+
+def encode_cursor(sort_value, row_id):
+    raw = json.dumps([sort_value, row_id], default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(table, fields, required=("id",)):
+    """
+    Column list for a ?fields=a,b,c projection, validated against the
+    cached schema, with the `required` columns first. None selects all.
+    """
+    if not fields:
+        return None
+
+    columns = list(required)
+    for name in fields.split(","):
+        name = name.strip().lower()
+        if not name or name in columns:
+            continue
+        if not schema.has_column(table, name):
+            raise HTTPException(status_code=400, detail=f"Cannot select unknown column '{name}'")
+        columns.append(name)
+    return columns
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PageQuery:
+    """
+    A SELECT over one table with optional filters, sort and keyset page.
+    Column SQL comes from the schema registry, so columns kept in the
+    attributes document work like physical ones.
+
+    Rows are always ordered by (sort column, id) with NULL sort values
+    last, which makes (sort value, id) of the last row a stable cursor.
+    One row more than `limit` is fetched to know if another page exists.
+
+    With `fields` (a ?fields= value) only those columns and id are
+    selected. A sort column outside the projection is selected too, for
+    the cursor, and removed from the rows by page() and visible().
+    """
+
+    def __init__(self, table, columns, query_params, limit=None, after=None, sort=None, fields=None):
+        self.table = table
+        self.limit = limit
+        self.params = {}
+        self.descending = False
+        self.sort_column = "id"
+
+        if sort:
+            self.descending = sort.startswith("-")
+            self.sort_column = sort.lstrip("-").lower()
+            if self.sort_column not in columns:
+                raise HTTPException(status_code=400, detail=f"Cannot sort by unknown column '{self.sort_column}'")
+
+        self.fields = parse_fields(table, fields)
+        self.hidden = set()
+        if self.fields and self.sort_column not in self.fields:
+            self.hidden.add(self.sort_column)
+
+        self.where = self._filters(columns, query_params)
+
+        if after:
+            self.where.append(self._keyset(*decode_cursor(after)))
+
+    def _filters(self, columns, query_params):
+        clauses = []
+        for i, (key, value) in enumerate(query_params.items()):
+            if key in RESERVED_PARAMS:
+                continue
+
+            name = key.lower()
+            if name in columns:
+                clause, self.params[f"f{i}"] = schema.equals_sql(self.table, name, f"f{i}", value)
+                clauses.append(clause)
+            elif name.endswith(PREFIX_SUFFIX) and name[:-len(PREFIX_SUFFIX)] in columns:
+                col = schema.column_sql(self.table, name[:-len(PREFIX_SUFFIX)])
+                clauses.append(f"CAST({col} AS VARCHAR) LIKE :f{i} ESCAPE '\\'")
+                self.params[f"f{i}"] = _escape_like(value) + "%"
+            else:
+                raise HTTPException(status_code=400, detail=f"Cannot filter by unknown column '{key}'")
+        return clauses
+
+    def _keyset(self, sort_value, row_id):
+        op = "<" if self.descending else ">"
+        self.params["cursor_id"] = row_id
+
+        if self.sort_column == "id":
+            return f"id {op} :cursor_id"
+
+        col = schema.column_sql(self.table, self.sort_column)
+        if sort_value is None:
+            # Already inside the trailing block of NULL sort values
+            return f"({col} IS NULL AND id {op} :cursor_id)"
+
+        self.params["cursor_value"] = sort_value
+        return (
+            f"({col} {op} :cursor_value"
+            f" OR ({col} = :cursor_value AND id {op} :cursor_id)"
+            f" OR {col} IS NULL)"
+        )
+
+    def order_by(self):
+        direction = "DESC" if self.descending else "ASC"
+        if self.sort_column == "id":
+            return f"id {direction}"
+        col = schema.column_sql(self.table, self.sort_column)
+        return f"({col} IS NULL), {col} {direction}, id {direction}"
+
+    def sql(self, select=None, lookahead=True):
+        if select is None:
+            columns = self.fields + sorted(self.hidden) if self.fields else None
+            select = schema.select_sql(self.table, columns)
+        sql = f"SELECT {select} FROM {self.table}"
+        if self.where:
+            sql += " WHERE " + " AND ".join(self.where)
+        sql += f" ORDER BY {self.order_by()}"
+        if self.limit is not None:
+            # Separate parameters, so a page query with lookahead and a
+            # subquery without it can share self.params
+            if lookahead:
+                sql += " LIMIT :page_limit"
+                self.params["page_limit"] = self.limit + 1
+            else:
+                sql += " LIMIT :page_size"
+                self.params["page_size"] = self.limit
+        return sql
+
+    def statement(self, select=None, lookahead=True):
+        return text(self.sql(select, lookahead))
+
+    def page(self, rows):
+        """
+        Trim the look-ahead row and return (rows, next_cursor).
+        """
+        if self.limit is None or len(rows) <= self.limit:
+            return self.visible(rows), None
+
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return self.visible(rows), encode_cursor(last[self.sort_column], last["id"])
+
+    def visible(self, rows):
+        """Drop columns that were selected only to build the cursor."""
+        if not self.hidden:
+            return rows
+        return [
+            {col: value for col, value in row.items() if col not in self.hidden}
+            for row in rows
+        ]
+
+    def visible_columns(self, columns):
+        """(names, positions) of the result columns that are sent."""
+        keep = [i for i, col in enumerate(columns) if col not in self.hidden]
+        return [columns[i] for i in keep], keep
+
+    def columnar(self, columns, rows):
+        """
+        page() for cursor tuples: trim the look-ahead row and return
+        (column names, rows as lists, next_cursor).
+        """
+        next_cursor = None
+        if self.limit is not None and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[columns.index(self.sort_column)], last[columns.index("id")])
+
+        names, keep = self.visible_columns(columns)
+        return names, [[row[i] for i in keep] for row in rows], next_cursor
+
+
+def fetch_page(conn, page):
+    """Run a PageQuery and return (row dicts, next_cursor)."""
+    rows = conn.execute(page.statement(), page.params).fetchall()
+    return page.page([dict(row._mapping) for row in rows])
+
+
+# ============================================================
+#         NDJSON STREAMING
+# ============================================================
+
+def ndjson_line(obj):
+    return dumps(obj) + b"\n"
+
+
+def stream_partitions(engine, statement, params, batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield lists of row dicts from a server-side cursor, batch_size at a time.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(statement, params)
+        for partition in result.partitions():
+            yield [dict(row._mapping) for row in partition]
+
+
+def ndjson_response(lines):
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+def stream_page(engine, page):
+    """
+    Stream a PageQuery as NDJSON, one row per line.
+
+    Only `limit` rows are sent and no next cursor is produced, since the
+    headers are already on the wire when the last row is known.
+    """
+    def lines():
+        for rows in stream_partitions(engine, page.statement(lookahead=False), page.params):
+            for row in page.visible(rows):
+                yield ndjson_line(row)
+
+    return ndjson_response(lines())
+
+
+# ============================================================
+#         COLUMNAR OUTPUT (?format=columnar|msgpack)
+# ============================================================
+# {"columns": [...], "rows": [[...], ...]} sends each column name once
+# instead of in every row. Rows go from the cursor tuples straight to the
+# encoder, without a dict per row. ?format=msgpack is the same document
+# as MessagePack, when the msgpack package is installed.
+#
+# With ?stream=ndjson the first line is {"columns": [...]} and every
+# following line is one row array.
+
+FORMAT_PATTERN = "^(columnar|msgpack)$"
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def check_format(response_format, stream=None):
+    if response_format != "msgpack":
+        return
+    if msgpack is None:
+        raise HTTPException(status_code=406, detail="MessagePack output needs the msgpack package")
+    if stream:
+        raise HTTPException(status_code=400, detail="format=msgpack cannot be streamed")
+
+
+def fetch_columnar(conn, page):
+    """fetch_page for columnar output: (columns, row lists, next_cursor)."""
+    result = conn.execute(page.statement(), page.params)
+    return page.columnar(list(result.keys()), result.fetchall())
+
+
+def columnar_response(columns, rows, next_cursor, response_format):
+    document = {"columns": columns, "rows": rows}
+    if response_format == "msgpack":
+        content, media_type = msgpack.packb(document, default=str), MSGPACK_MEDIA_TYPE
+    else:
+        content, media_type = dumps(document), "application/json"
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+def stream_columnar(engine, page):
+    """stream_page with a header line of column names and one array per row."""
+    def lines():
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=STREAM_BATCH_SIZE).execute(
+                page.statement(lookahead=False), page.params
+            )
+            columns, keep = page.visible_columns(list(result.keys()))
+            yield ndjson_line({"columns": columns})
+            for partition in result.partitions():
+                for row in partition:
+                    yield ndjson_line([row[i] for i in keep])
+
+    return ndjson_response(lines())
+
+
+def columnar_page(engine, page, response_format, stream=None):
+    """Serve a PageQuery in a columnar format, paged or streamed."""
+    check_format(response_format, stream)
+    if stream:
+        return stream_columnar(engine, page)
+
+    with engine.connect() as conn:
+        return columnar_response(*fetch_columnar(conn, page), response_format)
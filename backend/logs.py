@@ -0,0 +1,182 @@
+import atexit
+import copy
+import logging
+import queue
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import settings
+from serialization import dumps
+
+
+# ============================================================
+#         LOGGING (queue-backed, structured)
+# ============================================================
+# Modules log through logging.getLogger(__name__). configure(), called
+# from the app's lifespan, puts one QueueHandler on the root logger.
+# Request threads merge the message with its args (and render a
+# traceback) before queueing the record, so later changes to the args
+# cannot alter it, and never wait on I/O. A listener thread formats the
+# records and writes them to stderr. When the queue is full, records are
+# dropped and counted rather than blocking. shutdown() flushes the queue
+# and removes the handler.
+#
+# Records are one JSON object per line (LOG_FORMAT=json) or plain text.
+# Values passed with extra={...} become fields. Every string, including
+# the message and traceback, is cut to LOG_MAX_CHARS, so a payload
+# logged by mistake (a template with base64 images) costs little.
+#
+# LOG_LEVEL sets the default level. LOG_LEVELS overrides it per module,
+# e.g. "main=DEBUG,indexes=WARNING".
+
+# Library loggers that are chatty at INFO (SQLAlchemy would log every
+# statement and pool event); LOG_LEVELS can still turn them up
+QUIET_LOGGERS = {
+    "sqlalchemy": "WARNING",
+    "database.InstrumentedQueuePool": "WARNING",
+    "httpx": "WARNING",
+}
+
+# Attributes every LogRecord has; anything else came from extra={...}
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+def truncate(value, limit):
+    if isinstance(value, str):
+        if len(value) > limit:
+            return f"{value[:limit]}...(+{len(value) - limit} chars)"
+        return value
+    if isinstance(value, dict):
+        return {key: truncate(item, limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate(item, limit) for item in value]
+    return value
+
+
+def truncate_head(text, limit):
+    """Cut a traceback from the front; the end names the exception."""
+    if len(text) > limit:
+        return f"(-{len(text) - limit} chars)...{text[-limit:]}"
+    return text
+
+
+def record_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        limit = settings.LOG_MAX_CHARS
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": truncate(record.getMessage(), limit),
+        }
+        entry.update(truncate(record_fields(record), limit))
+        if record.exc_text:
+            entry["exc"] = truncate_head(record.exc_text, limit)
+        return dumps(entry).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        limit = settings.LOG_MAX_CHARS
+        line = (
+            f"{self.formatTime(record)} {record.levelname} {record.name}: "
+            f"{truncate(record.getMessage(), limit)}"
+        )
+        fields = record_fields(record)
+        if fields:
+            line += " " + " ".join(
+                f"{key}={dumps(truncate(value, limit)).decode()}" for key, value in fields.items()
+            )
+        if record.exc_text:
+            line += "\n" + truncate_head(record.exc_text, limit)
+        return line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that keeps extra fields for the listener and never blocks."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Like the base class, merge args into the message and render the
+        # traceback now, in the logging thread, so the record no longer
+        # refers to objects that may change. Unlike it, the message and
+        # the traceback stay separate and extra fields are kept, so the
+        # listener can still build structured output.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip("\n")
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(spec):
+    """LOG_LEVELS value ("main=DEBUG,indexes=WARNING") -> {logger: level}."""
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure():
+    """Install the queue handler and start the listener (once)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in {**QUIET_LOGGERS, **parse_levels(settings.LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Write out queued records, stop the listener and remove the handler."""
+    global _listener
+    if _listener is None:
+        return
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root.removeHandler(handler)
+    _listener.stop()
+    _listener = None
+
+
+def dropped():
+    """Records dropped because the queue was full."""
+    return sum(
+        handler.dropped for handler in logging.getLogger().handlers
+        if isinstance(handler, NonBlockingQueueHandler)
+    )
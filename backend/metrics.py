@@ -0,0 +1,201 @@
+import threading
+from bisect import bisect_left
+
+
+# ============================================================
+#         PROMETHEUS METRICS (/metrics)
+# ============================================================
+# Counters and histograms are kept per thread: each thread writes to its
+# own shard (a dict of label values -> plain list), so recording takes no
+# lock and allocates only the first time a label set is seen in that
+# thread. A scrape sums the shards. Label values are route templates,
+# methods and status classes, so the number of series stays small.
+#
+# Gauges (pool occupancy, schema cache counters) are read from their
+# owners at scrape time.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Single statement duration (seconds)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Response body bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REGISTRY = []
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def label_text(names, values, extra=()):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{escape(value)}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def number(value):
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+
+class Sharded:
+    """Per-thread storage, merged on scrape."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def shards(self):
+        with self._lock:
+            return list(self._shards)
+
+
+class Counter(Sharded):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, *labels):
+        shard = self.shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def samples(self):
+        totals = {}
+        for shard in self.shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        for labels, value in sorted(totals.items()):
+            yield f"{self.name}{label_text(self.labels, labels)} {number(value)}"
+
+
+class Histogram(Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labels=()):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        shard = self.shard()
+        series = shard.get(labels)
+        if series is None:
+            # One count per bucket, one for +Inf, then the sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        totals = {}
+        for shard in self.shards():
+            for labels, series in list(shard.items()):
+                merged = totals.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+                for i, value in enumerate(series):
+                    merged[i] += value
+
+        for labels, series in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield f"{self.name}_bucket{label_text(self.labels, labels, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{label_text(self.labels, labels)} {number(series[-1])}"
+            yield f"{self.name}_count{label_text(self.labels, labels)} {cumulative}"
+
+
+class Gauge:
+    """Values read at scrape time: collect() returns [(label values, value)]."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, collect, labels=(), kind="gauge"):
+        self.name = name
+        self.help = help_text
+        self.collect = collect
+        self.labels = labels
+        self.kind = kind
+        REGISTRY.append(self)
+
+    def samples(self):
+        for labels, value in self.collect():
+            if value is not None:
+                yield f"{self.name}{label_text(self.labels, labels)} {number(value)}"
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------
+# Request and Database Metrics
+# --------------------------
+REQUEST_LABELS = ("method", "route", "status")
+
+request_duration = Histogram(
+    "quotation_http_request_duration_seconds",
+    "Time from request start to the last response byte.",
+    LATENCY_BUCKETS, REQUEST_LABELS
+)
+response_size = Histogram(
+    "quotation_http_response_size_bytes",
+    "Response body bytes as sent (after compression).",
+    SIZE_BUCKETS, ("method", "route")
+)
+request_statements = Counter(
+    "quotation_http_request_db_statements_total",
+    "SQL statements executed while serving requests.",
+    ("method", "route")
+)
+request_db_seconds = Counter(
+    "quotation_http_request_db_seconds_total",
+    "Time spent in SQL statements while serving requests.",
+    ("method", "route")
+)
+request_pool_wait_seconds = Counter(
+    "quotation_http_request_pool_wait_seconds_total",
+    "Time requests spent waiting for a pooled connection.",
+    ("method", "route")
+)
+statement_duration = Histogram(
+    "quotation_db_statement_duration_seconds",
+    "Duration of single SQL statements.",
+    STATEMENT_BUCKETS
+)
+
+
+def status_class(status):
+    return f"{status // 100}xx"
+
+
+def observe_request(method, route, status, duration, response_bytes, stats):
+    request_duration.observe(duration, method, route, status_class(status))
+    response_size.observe(response_bytes, method, route)
+    request_statements.inc(stats.statements, method, route)
+    request_db_seconds.inc(stats.db_time, method, route)
+    request_pool_wait_seconds.inc(stats.pool_wait, method, route)
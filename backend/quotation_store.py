@@ -0,0 +1,343 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import bindparam, text
+
+import dialects
+from database import schema
+from listing import parse_fields
+
+
+# ============================================================
+#          PYDANTIC MODELS FOR QUOTATION WITH ITEMS
+# ============================================================
+
+class ItemData(BaseModel):
+    sample_activity: Optional[str] = None
+    specification: Optional[str] = None
+    hsn_sac_code: Optional[str] = None
+    qty: Optional[int] = None
+    unit: Optional[str] = None
+    unit_rate: Optional[int] = None
+    total_cost: Optional[int] = None
+
+
+class QuotationWithItemsRequest(BaseModel):
+    quotation_data: dict
+    items_data: List[dict]
+
+
+class UpdateQuotationWithItemsRequest(BaseModel):
+    quotation_data: Optional[dict] = None
+    items_data: Optional[List[dict]] = None
+    items_to_delete: Optional[List[int]] = None
+
+
+# ============================================================
+#         QUOTATION WITH ITEMS - DATA ACCESS
+# ============================================================
+# Every function takes an open Connection, so the same code serves the
+# sync endpoints and the async ones (through AsyncConnection.run_sync).
+
+# Item columns every projection keeps, to group items under quotations
+ITEM_KEY_COLUMNS = ("id", "quotation_id")
+
+
+def item_projection(item_fields):
+    """Column list for ?item_fields=, or None for every column."""
+    return parse_fields("items", item_fields, required=ITEM_KEY_COLUMNS)
+
+
+def items_for_quotations_sql(item_columns=None):
+    return text(f"""
+        SELECT {schema.select_sql("items", item_columns)} FROM items
+        WHERE quotation_id IN :qids
+        ORDER BY quotation_id, id
+    """).bindparams(bindparam("qids", expanding=True))
+
+
+def item_id_of(item_data):
+    """
+    The id of an item in items_data as an int, or None for a new item.
+    Ids sent as strings ("12") are accepted; anything else is a 400.
+    """
+    value = item_data.get("id")
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid item id: {value!r}")
+
+
+def not_found(quotation_id):
+    return HTTPException(
+        status_code=404,
+        detail=f"Quotation with ID {quotation_id} not found"
+    )
+
+
+def group_items(item_rows):
+    """Group item rows by quotation_id in one pass."""
+    items_by_quotation = {}
+    for item in item_rows:
+        item_dict = dict(item._mapping)
+        items_by_quotation.setdefault(item_dict["quotation_id"], []).append(item_dict)
+    return items_by_quotation
+
+
+def attach_items(quotations, items_by_quotation):
+    return [
+        {
+            "quotation": quotation_dict,
+            "items": items_by_quotation.get(quotation_dict["id"], [])
+        }
+        for quotation_dict in quotations
+    ]
+
+
+def items_for_quotations(conn, quotation_ids, item_columns=None):
+    if not quotation_ids:
+        return {}
+    return group_items(conn.execute(items_for_quotations_sql(item_columns), {"qids": quotation_ids}))
+
+
+def insert_items(conn, item_rows):
+    """
+    Insert many item rows in batched multi-row statements, on PostgreSQL
+    and SQLite alike (see dialects.insert_ids).
+
+    Returns the new ids in the same order as item_rows.
+    """
+    if not item_rows:
+        return []
+
+    rows = [schema.storage_row("items", row) for row in item_rows]
+    return dialects.insert_ids(conn, schema.table("items"), rows)
+
+
+def create(conn, req):
+    # Real column names come from the schema registry (no catalog query)
+    quotation_columns_all = schema.column_names("quotation")
+    items_columns_all = schema.column_names("items")
+
+    # Exclude 'id' safely
+    quotation_cols = [col for col in quotation_columns_all if col != "id"]
+    items_cols = [col for col in items_columns_all if col != "id"]
+
+    # Prepare quotation data (only allowed columns)
+    quotation_vals = {c: req.quotation_data.get(c) for c in quotation_cols}
+
+    insert_sql, quotation_vals = schema.insert_sql("quotation", quotation_vals)
+    quotation_sql = text(f"{insert_sql} RETURNING id")
+
+    # Insert quotation
+    result = conn.execute(quotation_sql, quotation_vals)
+    quotation_id = result.scalar()
+
+    item_rows = []
+    for item_data in req.items_data:
+        item_vals = {c: item_data.get(c) for c in items_cols}
+        item_vals["quotation_id"] = quotation_id  # Add foreign key
+        item_rows.append(item_vals)
+
+    created_items = insert_items(conn, item_rows)
+
+    return {
+        "status": "success",
+        "quotation_id": quotation_id,
+        "items_created": len(created_items),
+        "item_ids": created_items
+    }
+
+
+def fetch(conn, quotation_id, columns=None, item_columns=None):
+    """
+    One quotation and its items. columns / item_columns restrict the
+    selected columns (see parse_fields and item_projection).
+    """
+    quotation_sql = text(f"SELECT {schema.select_sql('quotation', columns)} FROM quotation WHERE id = :qid")
+    items_sql = text(f"SELECT {schema.select_sql('items', item_columns)} FROM items WHERE quotation_id = :qid")
+
+    # Get quotation
+    quotation_row = conn.execute(quotation_sql, {"qid": quotation_id}).fetchone()
+
+    if quotation_row is None:
+        raise not_found(quotation_id)
+
+    # Get all items for this quotation
+    items_rows = conn.execute(items_sql, {"qid": quotation_id}).fetchall()
+
+    return {
+        "quotation": dict(quotation_row._mapping),
+        "items": [dict(item._mapping) for item in items_rows]
+    }
+
+
+def fetch_all(conn, page, item_columns=None):
+    """
+    Fetch one page of quotations and all of their items in two
+    statements. The items subquery selects exactly the page (no
+    lookahead row). Returns (results, next_cursor).
+    """
+    items_sql = text(f"""
+        SELECT {schema.select_sql("items", item_columns)} FROM items
+        WHERE quotation_id IN (SELECT id FROM ({page.sql(select="id", lookahead=False)}) AS page)
+        ORDER BY quotation_id, id
+    """)
+
+    quotation_rows = conn.execute(page.statement(), page.params).fetchall()
+    items_by_quotation = group_items(conn.execute(items_sql, page.params))
+
+    quotations, next_cursor = page.page([dict(row._mapping) for row in quotation_rows])
+    return attach_items(quotations, items_by_quotation), next_cursor
+
+
+def update(conn, quotation_id, req):
+    # Step 1: Verify quotation exists
+    check_sql = text("SELECT 1 FROM quotation WHERE id = :qid")
+    exists = conn.execute(check_sql, {"qid": quotation_id}).fetchone()
+
+    if not exists:
+        raise not_found(quotation_id)
+
+    updated_sections = []
+
+    # Step 2: Update quotation data if provided (one UPDATE for all columns)
+    if req.quotation_data:
+        quotation_cols = schema.column_names("quotation")
+        quotation_vals = {
+            col.lower(): value
+            for col, value in req.quotation_data.items()
+            if col.lower() in quotation_cols and col.lower() != "id"
+        }
+
+        if quotation_vals:
+            set_sql, params = schema.assignments("quotation", quotation_vals)
+            update_sql = text(f"UPDATE quotation SET {set_sql} WHERE id = :qid")
+            conn.execute(update_sql, {**params, "qid": quotation_id})
+
+        updated_sections.append("quotation_data")
+
+    # Step 3: One ownership check for every item id referenced
+    referenced_ids = set(req.items_to_delete or [])
+    referenced_ids.update(
+        item_id_of(item_data) for item_data in req.items_data or [] if item_id_of(item_data)
+    )
+    owned_ids = set()
+    if referenced_ids:
+        owned_sql = text("""
+            SELECT id FROM items
+            WHERE quotation_id = :qid AND id IN :iids
+        """).bindparams(bindparam("iids", expanding=True))
+        owned_ids = set(conn.execute(
+            owned_sql,
+            {"qid": quotation_id, "iids": list(referenced_ids)}
+        ).scalars())
+
+    # Step 4: Delete items if specified
+    deleted_items = []
+    if req.items_to_delete:
+        deleted_items = list(dict.fromkeys(
+            item_id for item_id in req.items_to_delete if item_id in owned_ids
+        ))
+
+        if deleted_items:
+            delete_sql = text(
+                "DELETE FROM items WHERE id IN :iids"
+            ).bindparams(bindparam("iids", expanding=True))
+            conn.execute(delete_sql, {"iids": deleted_items})
+            updated_sections.append("deleted_items")
+
+    # Step 5: Update or create items
+    updated_items = []
+    created_items = []
+
+    if req.items_data:
+        # Extract just the column names, excluding 'id'
+        items_cols = [col for col in schema.column_names("items") if col != "id"]
+        remaining_ids = owned_ids.difference(deleted_items)
+
+        # Updates are grouped by the SET clause (i.e. the columns they
+        # touch), so each group runs as a single executemany UPDATE. On
+        # psycopg2 the engine sends an executemany in pages of statements
+        # (execute_batch, see dialects), not one round trip per row.
+        update_groups = {}
+        new_rows = []
+
+        for item_data in req.items_data:
+            item_id = item_id_of(item_data)
+
+            if item_id:
+                if item_id not in remaining_ids:
+                    continue  # Skip if item doesn't belong to this quotation
+
+                item_vals = {
+                    col.lower(): value
+                    for col, value in item_data.items()
+                    if col.lower() in items_cols and col.lower() != "quotation_id"
+                }
+                if item_vals:
+                    set_sql, params = schema.assignments("items", item_vals)
+                    update_groups.setdefault(set_sql, []).append(
+                        {**params, "iid": item_id}
+                    )
+
+                updated_items.append(item_id)
+
+            else:
+                item_vals = {c: item_data.get(c, None) for c in items_cols}
+                item_vals["quotation_id"] = quotation_id
+                new_rows.append(item_vals)
+
+        for set_sql, params in update_groups.items():
+            conn.execute(text(f"UPDATE items SET {set_sql} WHERE id = :iid"), params)
+
+        created_items = insert_items(conn, new_rows)
+
+        if updated_items:
+            updated_sections.append("updated_items")
+        if created_items:
+            updated_sections.append("created_items")
+
+    return {
+        "status": "success",
+        "quotation_id": quotation_id,
+        "updated_sections": updated_sections,
+        "items_updated": len(updated_items),
+        "items_created": len(created_items),
+        "items_deleted": len(deleted_items),
+        "updated_item_ids": updated_items,
+        "created_item_ids": created_items,
+        "deleted_item_ids": deleted_items
+    }
+
+
+def delete(conn, quotation_id):
+    check_sql = text("SELECT 1 FROM quotation WHERE id = :qid")
+    count_items_sql = text("SELECT COUNT(*) FROM items WHERE quotation_id = :qid")
+    delete_items_sql = text("DELETE FROM items WHERE quotation_id = :qid")
+    delete_quotation_sql = text("DELETE FROM quotation WHERE id = :qid")
+
+    # Check if quotation exists
+    exists = conn.execute(check_sql, {"qid": quotation_id}).fetchone()
+
+    if not exists:
+        raise not_found(quotation_id)
+
+    # Count items to be deleted
+    items_count = conn.execute(count_items_sql, {"qid": quotation_id}).scalar()
+
+    # Delete all items first (foreign key constraint)
+    conn.execute(delete_items_sql, {"qid": quotation_id})
+
+    # Delete quotation
+    conn.execute(delete_quotation_sql, {"qid": quotation_id})
+
+    return {
+        "status": "success",
+        "message": f"Quotation {quotation_id} and its {items_count} items deleted successfully",
+        "quotation_id": quotation_id,
+        "items_deleted": items_count
+    }
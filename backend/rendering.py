@@ -0,0 +1,271 @@
+import html
+import threading
+
+
+# ============================================================
+#         QUOTATION RENDERING ENGINE
+# ============================================================
+# Server-side counterpart of renderTemplateItem in Quotation.jsx. The
+# template JSON is compiled once into a RenderPlan: every block becomes
+# a step whose static markup (styles, labels, table header) is built and
+# escaped at compile time, so rendering a quotation only formats its
+# values.
+
+# Item columns never shown in the items table
+HIDDEN_ITEM_COLUMNS = {"id", "quotation_id"}
+
+CELL_STYLE = "border: 1px solid #ddd; padding: 8px"
+
+DOCUMENT_HEAD = (
+    "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>{title}</title>\n"
+    "<style>body {{ font-family: Arial, sans-serif; margin: 24px; }}</style>\n"
+    "</head>\n<body>\n"
+)
+DOCUMENT_TAIL = "\n</body>\n</html>\n"
+
+
+def format_label(column_name):
+    return " ".join(word[:1].upper() + word[1:] for word in column_name.split("_"))
+
+
+def display(value):
+    """Text for a value, following JavaScript's `value || '-'`."""
+    if not value:
+        return "-"
+    if value is True:
+        return "true"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def money(value):
+    if not value:
+        return "-"
+    try:
+        return f"₹ {float(value):.2f}"
+    except (TypeError, ValueError):
+        return "₹ NaN"
+
+
+def to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def style(**props):
+    """style="..." from CSS properties, skipping unset ones."""
+    declarations = "; ".join(
+        f"{name.replace('_', '-')}: {value}"
+        for name, value in props.items()
+        if value not in (None, "")
+    )
+    return f' style="{html.escape(declarations)}"' if declarations else ""
+
+
+def px(value):
+    return f"{value}px" if value not in (None, "") else None
+
+
+def text_style(block, **extra):
+    return style(
+        font_size=px(block.get("fontSize")),
+        font_weight=block.get("fontWeight"),
+        text_align=block.get("textAlign"),
+        color=block.get("color"),
+        **extra
+    )
+
+
+def static(markup):
+    return lambda quotation, items: markup
+
+
+# --------------------------
+# Block Compilers
+# --------------------------
+def compile_header(block, item_columns):
+    return static(
+        f"<div{text_style(block, margin_bottom='16px')}>"
+        f"{html.escape(display(block.get('value')))}</div>"
+    )
+
+
+def compile_text(block, item_columns):
+    return static(
+        f"<div{text_style(block, white_space='pre-wrap', margin_bottom='12px')}>"
+        f"{html.escape(display(block.get('value')))}</div>"
+    )
+
+
+def compile_field(block, item_columns):
+    key = block.get("fieldKey")
+    part_style = style(font_size=px(block.get("fontSize")), color=block.get("color"))
+    prefix = (
+        '<div style="display: flex; gap: 8px; flex-wrap: wrap; margin-bottom: 12px">'
+        f"<strong{part_style}>{html.escape(display(block.get('label')))}:</strong>"
+        f"<span{part_style}>"
+    )
+    suffix = "</span></div>"
+
+    def step(quotation, items):
+        return f"{prefix}{html.escape(display(quotation.get(key)))}{suffix}"
+    return step
+
+
+def compile_table(block, item_columns):
+    columns = [col for col in item_columns if col not in HIDDEN_ITEM_COLUMNS]
+    head = "".join(
+        f'<th style="{CELL_STYLE}; text-align: left">{html.escape(format_label(col))}</th>'
+        for col in columns
+    )
+    prefix = (
+        '<div style="width: 100%; overflow: auto; margin-bottom: 16px">'
+        f'<table{style(width="100%", border_collapse="collapse", font_size=px(block.get("fontSize") or 12))}>'
+        f'<thead><tr style="background-color: #f0f0f0">'
+        f'<th style="{CELL_STYLE}; text-align: left">Sl.No</th>{head}</tr></thead><tbody>'
+    )
+    suffix = "</tbody></table></div>"
+
+    # (column, formatter, opening <td>) resolved once per column
+    cells = [
+        (col, money, f'<td style="{CELL_STYLE}; text-align: right">')
+        if "rate" in col or "cost" in col
+        else (col, display, f'<td style="{CELL_STYLE}; text-align: left">')
+        for col in columns
+    ]
+    number_cell = f'<td style="{CELL_STYLE}">'
+
+    def step(quotation, items):
+        rows = []
+        for index, item in enumerate(items, start=1):
+            row = [f"<tr>{number_cell}{index}</td>"]
+            for col, fmt, td in cells:
+                row.append(f"{td}{html.escape(fmt(item.get(col)))}</td>")
+            row.append("</tr>")
+            rows.append("".join(row))
+        return prefix + "".join(rows) + suffix
+    return step
+
+
+def compile_total(block, item_columns):
+    prefix = (
+        f"<div{text_style(block, padding='12px', border='2px solid #1890ff', border_radius='8px', background_color='#e6f7ff', margin_bottom='16px')}>"
+        "<strong>Total Cost:</strong> ₹ "
+    )
+
+    def step(quotation, items):
+        total = sum(to_number(item.get("total_cost")) for item in items)
+        return f"{prefix}{total:.2f}</div>"
+    return step
+
+
+def compile_divider(block, item_columns):
+    return static('<hr style="margin: 8px 0; border: 0; border-top: 1px solid rgba(5, 5, 5, 0.06)">')
+
+
+def compile_image(block, item_columns):
+    if not block.get("value"):
+        return None
+
+    align = block.get("textAlign") or "center"
+    justify = {"left": "flex-start", "right": "flex-end"}.get(align, "center")
+    image_style = style(
+        width=px(block.get("width")),
+        height=px(block.get("height")),
+        object_fit=block.get("objectFit") or "contain"
+    )
+    return static(
+        f"<div{style(text_align=align, display='flex', justify_content=justify, margin_bottom='16px')}>"
+        f'<img src="{html.escape(str(block["value"]))}" alt="Template Image"{image_style}></div>'
+    )
+
+
+BLOCK_COMPILERS = {
+    "header": compile_header,
+    "field": compile_field,
+    "table": compile_table,
+    "total": compile_total,
+    "divider": compile_divider,
+    "text": compile_text,
+    "image": compile_image,
+}
+
+
+# --------------------------
+# Render Plan
+# --------------------------
+class RenderPlan:
+    def __init__(self, steps, version=None):
+        self.steps = steps
+        self.version = version
+
+    def render(self, quotation, items):
+        """HTML fragment for one quotation (dict) and its items (list of dicts)."""
+        return "\n".join(step(quotation, items) for step in self.steps)
+
+    def render_document(self, quotation, items):
+        title = html.escape(f"Quotation {quotation.get('id', '')}")
+        return DOCUMENT_HEAD.format(title=title) + self.render(quotation, items) + DOCUMENT_TAIL
+
+
+def compile_template(template, item_columns, version=None):
+    """
+    Compile a template (list of blocks) into a RenderPlan. Unknown block
+    types are skipped, as in the React view.
+    """
+    steps = []
+    for block in template:
+        compiler = BLOCK_COMPILERS.get(block.get("type"))
+        step = compiler(block, item_columns) if compiler else None
+        if step is not None:
+            steps.append(step)
+    return RenderPlan(steps, version)
+
+
+class PlanCache:
+    """Compiled plans keyed by the version they were compiled for."""
+
+    # Versions differ only by template/schema changes and base URL, so a
+    # handful of entries is plenty
+    MAX_PLANS = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans = {}
+        self.compiles = 0
+
+    def get(self, version, compile_plan):
+        plan = self._plans.get(version)
+        if plan is not None:
+            return plan
+
+        plan = compile_plan()
+        with self._lock:
+            self.compiles += 1
+            if len(self._plans) >= self.MAX_PLANS:
+                self._plans.clear()
+            self._plans[version] = plan
+        return plan
+
+
+# --------------------------
+# Process Pool Entry Point
+# --------------------------
+# Each batch worker process compiles a plan once per version and keeps it
+# for every later chunk (see batch_render).
+worker_plans = PlanCache()
+
+
+def render_chunk(version, template, item_columns, chunk):
+    """
+    Render [(quotation, items), ...] into [(quotation_id, html), ...].
+    """
+    plan = worker_plans.get(version, lambda: compile_template(template, item_columns, version))
+    return [
+        (quotation["id"], plan.render_document(quotation, items))
+        for quotation, items in chunk
+    ]
@@ -0,0 +1,174 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+import metrics
+import settings
+
+
+# ============================================================
+#         PER-REQUEST INSTRUMENTATION (Server-Timing)
+# ============================================================
+# RequestStatsMiddleware gives every HTTP request a RequestStats, held in
+# a context variable. Context variables follow the request into the
+# threadpool (sync endpoints and streaming generators) and into the
+# async driver's greenlets. The engine event hooks and the pool add to
+# it:
+#
+#   * statements, total DB time and rows affected: the driver's rowcount
+#     for statements without a result set (UPDATE, DELETE, INSERT without
+#     RETURNING). Rows read are not counted, and neither are writes with
+#     RETURNING: for those the driver has no count until the rows are read
+#   * time spent waiting for a pooled connection
+#
+# The totals go out in a Server-Timing header and one log record per
+# request. Requests slower than REQUEST_SLOW_MS also log their
+# statements (first SLOW_REQUEST_MAX_STATEMENTS of them) with their
+# timings. They are also added to the /metrics counters and histograms.
+
+logger = logging.getLogger(__name__)
+
+current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("started", "statements", "db_time", "rows_affected", "pool_wait", "log")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows_affected = 0
+        self.pool_wait = 0.0
+        self.log = []
+
+    def record_statement(self, statement, elapsed, rows_affected=0):
+        self.statements += 1
+        self.db_time += elapsed
+        if rows_affected > 0:
+            self.rows_affected += rows_affected
+        if len(self.log) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+            self.log.append((statement, elapsed))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} statements", '
+            f"pool;dur={self.pool_wait * 1000:.1f}, "
+            f"app;dur={self.elapsed() * 1000:.1f}"
+        )
+
+
+def record_pool_wait(waited):
+    """Called by the instrumented pool after every checkout."""
+    stats = current.get()
+    if stats is not None:
+        stats.pool_wait += waited
+
+
+# --------------------------
+# Engine Hooks
+# --------------------------
+def rows_affected(cursor):
+    """rowcount of a statement without a result set; 0 for the rest."""
+    if cursor.description is None:
+        return max(cursor.rowcount, 0)
+    return 0
+
+
+def instrument(engine):
+    """Count statements on a sync engine (for async, its sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._stats_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._stats_started
+        metrics.statement_duration.observe(elapsed)
+        stats = current.get()
+        if stats is not None:
+            stats.record_statement(statement, elapsed, rows_affected(cursor))
+
+
+# --------------------------
+# Middleware
+# --------------------------
+# Metrics label for requests that matched no route, so unknown paths
+# do not each create a series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_path(scope, default=None):
+    """The matched route's path template (/quotation-with-items/{quotation_id})."""
+    route = scope.get("route")
+    return getattr(route, "path", default or scope["path"])
+
+
+def log_request(scope, status, stats):
+    """One record per request, with the totals as fields; slow ones at WARNING."""
+    elapsed = stats.elapsed()
+    entry = {
+        "method": scope["method"],
+        "route": route_path(scope),
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 2),
+        "db_ms": round(stats.db_time * 1000, 2),
+        "statements": stats.statements,
+        "rows_affected": stats.rows_affected,
+        "pool_wait_ms": round(stats.pool_wait * 1000, 2),
+    }
+    if elapsed * 1000 < settings.REQUEST_SLOW_MS:
+        logger.info("request", extra=entry)
+        return
+
+    entry["slow"] = True
+    entry["statement_log"] = [
+        {"sql": " ".join(statement.split()), "ms": round(took * 1000, 2)}
+        for statement, took in stats.log
+    ]
+    logger.warning("slow request", extra=entry)
+
+
+class RequestStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current.set(stats)
+        status = None
+        response_bytes = 0
+
+        async def send_with_timing(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streamed bodies keep running after this; the log line
+                # has the final totals
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current.reset(token)
+            status = status or 500
+            metrics.observe_request(
+                scope["method"], route_path(scope, UNMATCHED_ROUTE), status,
+                stats.elapsed(), response_bytes, stats
+            )
+            log_request(scope, status, stats)
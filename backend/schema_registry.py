@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+
+from sqlalchemy import JSON, Boolean, Column, Integer, MetaData, Numeric, String, Table
+from sqlalchemy.dialects.postgresql import JSONB
+
+import attribute_store
+import dialects
+from attribute_store import ATTRIBUTES
+
+
+# ============================================================
+#         SCHEMA REGISTRY (in-process column metadata cache)
+# ============================================================
+
+# information_schema data_type -> SQLAlchemy type for Core statements
+SQL_TYPES = {
+    "integer": Integer,
+    "bigint": Integer,
+    "smallint": Integer,
+    "numeric": Numeric,
+    "boolean": Boolean,
+}
+
+
+class SchemaRegistry:
+    """
+    Serves column metadata for the dynamic tables from memory.
+
+    Columns are read from the database (see dialects) the first time a
+    table is asked for and kept until the DDL endpoints call invalidate(). Every
+    invalidation bumps the version, so callers can tell when the schema
+    they saw is stale.
+
+    DDL run through another process never reaches invalidate() here, so
+    a column list older than max_age seconds is read again. If it has
+    changed, the table is invalidated as if the DDL had run here.
+
+    With attributes=True, columns registered in column_registry are
+    listed after the physical ones and stored in the attributes document
+    (see attribute_store). SQL that names columns is built through
+    select_sql(), column_sql(), equals_sql(), insert_sql() and
+    assignments(), which read attribute columns out of the document.
+    With attributes=False they produce plain column SQL.
+    """
+
+    def __init__(self, engine, attributes=False, max_age=None):
+        self.engine = engine
+        self.attributes = attributes
+        self.max_age = max_age
+        self.dialect = engine.dialect.name
+        self._lock = threading.Lock()
+        # table -> (loaded_at, columns)
+        self._columns = {}
+        self._tables = {}
+        self._table_versions = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _physical_columns(self, conn, table):
+        """[(column_name, data_type), ...] of the table itself."""
+        return dialects.physical_columns(conn, table)
+
+    def _load(self, table):
+        with self.engine.connect() as conn:
+            columns = [
+                {"column_name": name, "data_type": data_type, "attribute": None}
+                for name, data_type in self._physical_columns(conn, table)
+                if not (self.attributes and name == ATTRIBUTES)
+            ]
+            if self.attributes:
+                columns.extend(
+                    {"column_name": row.column_name, "data_type": row.data_type, "attribute": row.storage_key}
+                    for row in conn.execute(attribute_store.REGISTRY_SQL, {"table": table})
+                )
+            return tuple(columns)
+
+    def _fresh(self, loaded_at):
+        return self.max_age is None or time.monotonic() - loaded_at < self.max_age
+
+    def _get(self, table):
+        with self._lock:
+            cached = self._columns.get(table)
+            if cached is not None and self._fresh(cached[0]):
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            columns = self._load(table)
+            if cached is not None and cached[1] != columns:
+                # Changed by DDL in another process
+                self._invalidate({table})
+            self._columns[table] = (time.monotonic(), columns)
+            return columns
+
+    def columns(self, table):
+        """Return [{"column_name", "data_type"}, ...] in ordinal order."""
+        return [
+            {"column_name": col["column_name"], "data_type": col["data_type"]}
+            for col in self._get(table)
+        ]
+
+    def column_names(self, table):
+        return [col["column_name"] for col in self._get(table)]
+
+    def has_column(self, table, column):
+        return any(col["column_name"] == column for col in self._get(table))
+
+    def _column(self, table, column):
+        for col in self._get(table):
+            if col["column_name"] == column:
+                return col
+        return None
+
+    def is_attribute(self, table, column):
+        """True if the column is stored in the attributes document."""
+        col = self._column(table, column)
+        return bool(col and col["attribute"])
+
+    def table(self, table):
+        """
+        Return a Table for Core statements (bulk insert etc.).
+
+        Unlike the module-level Table objects it includes the dynamic
+        columns. It is built from the cached column list, once per
+        schema version.
+        """
+        with self._lock:
+            version = self._table_versions.get(table, 0)
+        cached_columns = self._get(table)
+        with self._lock:
+            built = self._tables.get(table)
+        if built is not None:
+            return built
+
+        columns = [
+            Column(col["column_name"], SQL_TYPES.get(col["data_type"], String))
+            for col in cached_columns
+            if col["column_name"] != "id" and not col["attribute"]
+        ]
+        if self.attributes:
+            columns.append(Column(ATTRIBUTES, JSON().with_variant(JSONB(), "postgresql")))
+        built = Table(table, MetaData(), Column("id", Integer, primary_key=True), *columns)
+        with self._lock:
+            if self._table_versions.get(table, 0) != version:
+                # Invalidated while building: use it for this call only
+                return built
+            return self._tables.setdefault(table, built)
+
+    # --------------------------
+    # SQL for column names
+    # --------------------------
+    def select_sql(self, table, columns=None):
+        """
+        SELECT list giving every column (or only `columns`, already
+        validated) under its name.
+        """
+        if columns is None:
+            if not self.attributes:
+                return "*"
+            selected = self._get(table)
+        else:
+            selected = [self._column(table, column) for column in columns]
+
+        return ", ".join(
+            f"{attribute_store.read_sql(self.dialect, col['attribute'], col['data_type'])} AS {col['column_name']}"
+            if col["attribute"] else col["column_name"]
+            for col in selected
+        )
+
+    def column_sql(self, table, column):
+        """Expression for one column, for WHERE and ORDER BY."""
+        col = self._column(table, column)
+        if col is None or not col["attribute"]:
+            return column
+        return attribute_store.read_sql(self.dialect, col["attribute"], col["data_type"])
+
+    def equals_sql(self, table, column, param, value):
+        """(clause, bound value) for column = :param."""
+        col = self._column(table, column)
+        if col is None or not col["attribute"]:
+            return f"{column} = :{param}", value
+        value = attribute_store.coerce(value, col["data_type"], column)
+        return attribute_store.equals_sql(self.dialect, col["attribute"], col["data_type"], param, value)
+
+    def storage_row(self, table, values):
+        """
+        {column: value} as stored: physical columns as they are and, when
+        attribute columns are enabled, the others gathered into one
+        attributes document (for Core inserts through table()).
+        """
+        if not self.attributes:
+            return dict(values)
+
+        row = {}
+        document = {}
+        for column, value in values.items():
+            col = self._column(table, column)
+            if col is not None and col["attribute"]:
+                value = attribute_store.coerce(value, col["data_type"], column)
+                if value is not None:
+                    document[col["attribute"]] = value
+            else:
+                row[column] = value
+        row[ATTRIBUTES] = document
+        return row
+
+    def insert_sql(self, table, values):
+        """(INSERT statement, params) for one row of {column: value}."""
+        row = self.storage_row(table, values)
+        params = []
+        for column in row:
+            if self.attributes and column == ATTRIBUTES:
+                row[column] = json.dumps(row[column])
+                params.append(attribute_store.document_sql(self.dialect, column))
+            else:
+                params.append(f":{column}")
+        return f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join(params)})", row
+
+    def assignments(self, table, values, prefix="v_"):
+        """
+        (SET clause, params) for {column: value}. Attribute columns are
+        merged into the document with a single assignment.
+        """
+        clauses = []
+        params = {}
+        document = {}
+        for column, value in values.items():
+            col = self._column(table, column)
+            if col is not None and col["attribute"]:
+                document[col["attribute"]] = attribute_store.coerce(value, col["data_type"], column)
+            else:
+                clauses.append(f"{column} = :{prefix}{column}")
+                params[f"{prefix}{column}"] = value
+
+        if document:
+            param = f"{prefix}{ATTRIBUTES}"
+            clauses.append(f"{ATTRIBUTES} = {attribute_store.merge_sql(self.dialect, param)}")
+            params[param] = json.dumps(document)
+        return ", ".join(clauses), params
+
+    def table_version(self, table):
+        return self._table_versions.get(table, 0)
+
+    def _invalidate(self, tables):
+        """Drop the Tables built for `tables` and bump their versions (lock held)."""
+        for name in tables:
+            self._tables.pop(name, None)
+            self._table_versions[name] = self._table_versions.get(name, 0) + 1
+        self.version += 1
+        return self.version
+
+    def invalidate(self, table=None):
+        """Drop cached metadata after DDL and bump the schema version."""
+        with self._lock:
+            if table is None:
+                tables = set(self._columns) | set(self._tables) | set(self._table_versions)
+                self._columns.clear()
+            else:
+                tables = {table}
+                self._columns.pop(table, None)
+            return self._invalidate(tables)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "table_versions": dict(self._table_versions),
+                "cached_tables": sorted(self._columns),
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
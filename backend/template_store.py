@@ -0,0 +1,44 @@
+import json
+
+from sqlalchemy import text
+
+import assets
+
+
+# ============================================================
+#         GLOBAL QUOTATION TEMPLATE - DATA ACCESS
+# ============================================================
+# Like quotation_store, every function takes an open Connection.
+
+VERSION_SQL = text("""
+    SELECT id, updated_at FROM global_quotation_template 
+    WHERE user_id = :uid
+""")
+
+DATA_SQL = text("""
+    SELECT template_data FROM global_quotation_template 
+    WHERE id = :id
+""")
+
+
+def version(conn, user_id="default"):
+    """
+    (id, updated_at) of the stored template, or None if there is none.
+    Cheap enough to run on every request to validate caches.
+    """
+    stored = conn.execute(VERSION_SQL, {"uid": user_id}).fetchone()
+    return (stored.id, stored.updated_at) if stored else None
+
+
+def load(conn, stored_version, base_url):
+    """
+    The parsed template for a version returned by version(), with asset
+    URLs expanded against base_url. Empty list if there is no template.
+    """
+    if stored_version is None:
+        return []
+
+    result = conn.execute(DATA_SQL, {"id": stored_version[0]}).fetchone()
+    if not result or not result[0]:
+        return []
+    return assets.expand_assets(json.loads(result[0]), base_url)
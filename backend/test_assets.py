@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import json
+
+import pytest
+
+import assets
+from conftest import scalars
+
+TEMPLATE_URL = "/user-preferences/global-quotation-template"
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+def data_url(content_type, data):
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+def stored_template(engine):
+    [data] = scalars(engine, "SELECT template_data FROM global_quotation_template WHERE user_id = 'default'")
+    return json.loads(data)
+
+
+def save(client, template):
+    return client.post(TEMPLATE_URL, json={"template": template})
+
+
+def test_images_are_stripped_on_save_and_expanded_on_read(client, app_module):
+    digest = hashlib.sha256(PNG).hexdigest()
+    template = [
+        {"id": "logo", "type": "image", "value": data_url("image/png", PNG)},
+        {"id": "title", "type": "text", "value": "Test report"},
+    ]
+    assert save(client, template).status_code == 200
+
+    # Only the hash is stored in the template
+    stored = stored_template(app_module.engine)
+    assert stored[0] == {"id": "logo", "type": "image", "value": None, "asset": digest}
+    assert stored[1] == template[1]
+
+    # ...and read back as a URL serving the same bytes
+    read = client.get(TEMPLATE_URL).json()["template"]
+    assert read[0]["value"] == f"http://testserver/assets/{digest}"
+    assert read[1] == template[1]
+
+    image = client.get(read[0]["value"])
+    assert image.content == PNG
+    assert image.headers["content-type"] == "image/png"
+    assert image.headers["x-content-type-options"] == "nosniff"
+    assert client.get(read[0]["value"], headers={"If-None-Match": f'"{digest}"'}).status_code == 304
+
+
+def test_resaving_keeps_images_and_removing_one_drops_it(client, app_module):
+    save(client, [
+        {"id": "logo", "type": "image", "value": data_url("image/png", PNG)},
+        {"id": "stamp", "type": "image", "value": data_url("image/gif", b"GIF89a stamp")},
+    ])
+
+    # The editor sends back what it read: the asset URLs
+    template = client.get(TEMPLATE_URL).json()["template"]
+    assert save(client, template).status_code == 200
+    assert client.get(TEMPLATE_URL).json()["template"] == template
+
+    template[1]["value"] = None
+    save(client, template)
+    stored = stored_template(app_module.engine)
+    assert "asset" in stored[0]
+    assert stored[1] == {"id": "stamp", "type": "image", "value": None}
+    assert client.get(TEMPLATE_URL).json()["template"][1]["value"] is None
+
+
+def test_same_bytes_are_stored_once(client, app_module):
+    first = client.post("/assets", json={"data_url": data_url("image/jpg", b"\xff\xd8 jpeg")}).json()
+    second = client.post("/assets", json={"data_url": data_url("image/jpeg", b"\xff\xd8 jpeg")}).json()
+    assert first == second
+    assert scalars(
+        app_module.engine, "SELECT content_type FROM template_assets WHERE hash = :hash", hash=first["hash"]
+    ) == ["image/jpeg"]
+
+
+@pytest.mark.parametrize("content_type", ["text/html", "image/svg+xml", "application/octet-stream"])
+def test_only_raster_images_are_accepted(client, content_type):
+    url = data_url(content_type, b"<svg onload=alert(1)>")
+    assert client.post("/assets", json={"data_url": url}).status_code == 400
+    assert save(client, [{"id": "x", "type": "image", "value": url}]).status_code == 400
+
+
+def test_non_data_values_are_left_alone():
+    template = [{"id": "a", "value": "https://example.com/logo.png"}, {"id": "b", "value": 3}]
+    assert assets.extract_assets(None, template) == template
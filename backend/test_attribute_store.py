@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import text
+
+import attribute_store
+from attribute_store import ATTRIBUTES
+from conftest import all_pages, create_charges, scalars
+
+
+@pytest.fixture(scope="module")
+def attributes(client, app_module):
+    """
+    Switch the app to COLUMN_STORE=attributes for charges, and back (the
+    attributes column is dropped again so later tests see the plain table).
+    """
+    schema, engine = app_module.schema, app_module.engine
+    attribute_store.ensure_columns(engine, ["charges"])
+    schema.attributes = True
+    schema.invalidate("charges")
+    app_module.charge_index.invalidate()
+    try:
+        yield schema
+    finally:
+        schema.attributes = False
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM column_registry WHERE table_name = 'charges'"))
+            conn.execute(text(f"ALTER TABLE charges DROP COLUMN {ATTRIBUTES}"))
+        schema.invalidate("charges")
+        app_module.charge_index.invalidate()
+
+
+@pytest.fixture(scope="module")
+def lab_columns(client, attributes):
+    for name, column_type in (("lab", "string"), ("priority", "int"), ("urgent", "boolean")):
+        response = client.post("/charges/add-column", json={"column_name": name, "column_type": column_type})
+        assert response.status_code == 200, response.text
+    return attributes
+
+
+def physical_columns(engine):
+    return scalars(engine, "SELECT name FROM pragma_table_info('charges')")
+
+
+def test_added_columns_are_not_physical(client, app_module, lab_columns):
+    assert {"lab", "priority", "urgent"}.isdisjoint(physical_columns(app_module.engine))
+    columns = client.get("/charges/columns").json()["columns"]
+    assert columns[-3:] == ["lab", "priority", "urgent"]
+    assert ATTRIBUTES not in columns
+
+
+def test_filters_and_sorts_on_attribute_columns(client, lab_columns, tag):
+    rows = [
+        {"name": f"{tag} {i}", "lab": lab, "priority": priority, "urgent": urgent}
+        for i, (lab, priority, urgent) in enumerate([
+            ("Pune", 2, True), ("Mumbai", 1, False), ("Pune", None, False),
+            ("Nagpur", 2, False), ("Pune-East", 3, True),
+        ])
+    ]
+    ids = create_charges(client, rows)
+
+    def ids_for(**params):
+        return [row["id"] for row in client.get("/charges", params={"name__prefix": tag, **params}).json()]
+
+    # Query string values are coerced to the column type
+    assert ids_for(priority="2") == [ids[0], ids[3]]
+    assert ids_for(urgent="true") == [ids[0], ids[4]]
+    assert ids_for(lab="Pune") == [ids[0], ids[2]]
+    assert ids_for(lab__prefix="Pune") == [ids[0], ids[2], ids[4]]
+    assert ids_for(lab="Pune", priority=2) == [ids[0]]
+
+    # Numeric order (3 after 2, not text order), NULLs last, across pages
+    got, _ = all_pages(client, "/charges", {"name__prefix": tag, "sort": "-priority", "limit": 2})
+    assert [row["id"] for row in got] == [ids[4], ids[3], ids[0], ids[1], ids[2]]
+    assert got[0]["priority"] == 3 and got[-1]["priority"] is None
+
+    assert client.get("/charges", params={"priority": "high"}).status_code == 400
+
+
+def test_rename_and_drop_attribute_columns(client, lab_columns, tag):
+    [cid] = create_charges(client, [{"name": f"{tag} soil", "lab": "Pune"}])
+    edit = client.put("/charges/update-fields", json={"edits": [{"id": cid, "column_name": "lab", "value": "Nashik"}]})
+    assert edit.json()["rows"][0]["lab"] == "Nashik"
+
+    assert client.post("/charges/rename-column", json={"old_name": "lab", "new_name": "site"}).status_code == 200
+    [row] = client.get("/charges", params={"site": "Nashik", "name__prefix": tag}).json()
+    assert row["id"] == cid and "lab" not in row
+
+    assert client.post("/charges/delete-column", json={"column_name": "site"}).status_code == 200
+    assert client.get("/charges", params={"site": "Nashik"}).status_code == 400
+
+    # A new column with the old name does not see the dropped values
+    client.post("/charges/add-column", json={"column_name": "site"})
+    [row] = client.get("/charges", params={"name__prefix": tag}).json()
+    assert row["site"] is None
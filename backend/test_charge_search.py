@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+import settings
+from conftest import create_charges, scalars
+
+NAMES = [
+    "Soil pH", "Soil moisture", "Topsoil density", "Water pH", "Water TDS",
+    "pH of soil extract", "Chloride", "Sulphate", "Moisture content (oven)",
+    "Liquid limit", "Plastic limit", "Shrinkage limit", "Free swell index",
+    "CBR (soaked)", "CBR (unsoaked)", "Specific gravity", "Sieve analysis",
+    "Hydrometer analysis", "Proctor compaction", "Direct shear", "Triaxial UU",
+]
+
+QUERIES = [
+    "s", "so", "soil", "SOIL", "oil", "ph", "pH o", "il m", "it", "limit",
+    "moist", "analysis", "cbr (", "(un", "aked)", "zz", "shear x",
+]
+
+
+@pytest.fixture(scope="module")
+def charges(client):
+    return create_charges(client, [{"name": name} for name in NAMES])
+
+
+def like_scan(engine, q):
+    """Ids of every charge whose name contains q, the way SQL would find them."""
+    return set(scalars(
+        engine,
+        "SELECT id FROM charges WHERE lower(name) LIKE :pattern",
+        pattern=f"%{q.lower()}%",
+    ))
+
+
+@pytest.mark.parametrize("q", QUERIES)
+def test_search_finds_what_a_like_scan_finds(client, app_module, charges, q):
+    found = client.get("/charges/search", params={"q": q, "limit": 100}).json()
+    expected = like_scan(app_module.engine, q)
+    assert len(expected) < 100
+    assert {row["id"] for row in found} == expected
+
+
+def test_name_prefix_matches_rank_first(client, charges):
+    found = client.get("/charges/search", params={"q": "soil", "limit": 10}).json()
+    names = [row["name"] for row in found]
+    assert names[:2] == ["Soil moisture", "Soil pH"]
+    # Then a word starting with it, then any other substring
+    assert names.index("pH of soil extract") < names.index("Topsoil density")
+
+
+def test_limit_cuts_results(client, charges):
+    found = client.get("/charges/search", params={"q": "limit", "limit": 2}).json()
+    assert [row["name"] for row in found] == ["Liquid limit", "Plastic limit"]
+
+
+def test_writes_update_the_index(client, charges, tag):
+    [cid] = create_charges(client, [{"name": f"{tag} Bulk density"}])
+    assert [row["id"] for row in client.get("/charges/search", params={"q": tag}).json()] == [cid]
+
+    client.put("/charges/update-field", json={"charge_id": cid, "column_name": "name", "value": "Dry density"})
+    assert client.get("/charges/search", params={"q": tag}).json() == []
+
+    client.delete(f"/charges/{cid}")
+    assert cid not in {row["id"] for row in client.get("/charges/search", params={"q": "density"}).json()}
+
+
+def test_stale_index_is_served_while_it_rebuilds(client, app_module, charges, tag, monkeypatch):
+    index = app_module.charge_index
+    index.search("", 1)
+    # A write from another worker, which this process's index has not seen
+    with app_module.engine.begin() as conn:
+        conn.execute(text("INSERT INTO charges (name) VALUES (:name)"), {"name": f"{tag} Bitumen"})
+
+    # Hold the rebuild until the stale index has answered
+    release = threading.Event()
+    rebuild = index._rebuild
+
+    def held_rebuild():
+        assert release.wait(5)
+        rebuild()
+
+    monkeypatch.setattr(index, "_rebuild", held_rebuild)
+    monkeypatch.setattr(settings, "CHARGE_SEARCH_MAX_AGE", 0.0)
+    builds = index.builds
+    assert client.get("/charges/search", params={"q": tag}).json() == []
+    assert index.stats()["rebuilding"]
+
+    monkeypatch.setattr(settings, "CHARGE_SEARCH_MAX_AGE", 300.0)
+    release.set()
+    deadline = time.monotonic() + 5
+    while index.stats()["rebuilding"]:
+        assert time.monotonic() < deadline, "background rebuild did not finish"
+        time.sleep(0.01)
+
+    assert index.builds == builds + 1
+    assert [row["name"] for row in client.get("/charges/search", params={"q": tag}).json()] == [f"{tag} Bitumen"]
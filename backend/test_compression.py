@@ -0,0 +1,97 @@
+import asyncio
+import zlib
+
+import pytest
+from starlette.responses import Response, StreamingResponse
+
+import compression
+from compression import CompressionMiddleware
+
+
+LINE = b'{"id": 1, "name": "Moisture content"}\n'
+
+
+def run(app, accept_encoding):
+    """Send one GET through the middleware; return (start message, body messages)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    # ASGI 2.4: StreamingResponse does not poll receive() for a disconnect
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    return messages[0], messages[1:]
+
+
+def headers(start):
+    return {key.decode(): value.decode() for key, value in start["headers"]}
+
+
+def test_gzip_stream_flushes_each_line():
+    # The app sends its second line only after the first one has reached
+    # the client decompressed, so an unflushed gzip stream fails here
+    first_line_seen = None
+    decompressor = zlib.decompressobj(wbits=31)
+    received = []
+
+    async def lines():
+        yield LINE
+        await asyncio.wait_for(first_line_seen.wait(), timeout=1)
+        yield LINE
+
+    async def app(scope, receive, send):
+        nonlocal first_line_seen
+        first_line_seen = asyncio.Event()
+
+        async def send_and_check(message):
+            await send(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                received.append(decompressor.decompress(message["body"]))
+                if LINE in b"".join(received):
+                    first_line_seen.set()
+
+        response = StreamingResponse(lines(), media_type="application/x-ndjson")
+        await response(scope, receive, send_and_check)
+
+    start, _ = run(app, "gzip")
+    assert headers(start)["content-encoding"] == "gzip"
+    assert received[0] == LINE
+    assert b"".join(received) + decompressor.flush() == LINE * 2
+
+
+def test_large_body_is_gzipped_and_small_one_is_not():
+    big = Response(LINE * 100, media_type="application/json")
+    start, body = run(big, "gzip, deflate")
+    assert headers(start)["content-encoding"] == "gzip"
+    assert zlib.decompress(body[0]["body"], wbits=31) == LINE * 100
+
+    start, body = run(Response(LINE, media_type="application/json"), "gzip")
+    assert "content-encoding" not in headers(start)
+    assert body[0]["body"] == LINE
+
+
+def test_zip_is_not_recompressed():
+    start, body = run(Response(b"PK" + b"\0" * 5000, media_type="application/zip"), "gzip, br")
+    assert "content-encoding" not in headers(start)
+    assert body[0]["body"] == b"PK" + b"\0" * 5000
+
+
+def test_identity_without_accept_encoding():
+    start, body = run(Response(LINE * 100, media_type="application/json"), "")
+    assert "content-encoding" not in headers(start)
+    assert body[0]["body"] == LINE * 100
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+def test_brotli_preferred_when_accepted():
+    start, body = run(Response(LINE * 100, media_type="application/json"), "gzip, br")
+    assert headers(start)["content-encoding"] == "br"
+    assert compression.brotli.decompress(body[0]["body"]) == LINE * 100
@@ -0,0 +1,81 @@
+from conftest import all_pages, create_charges
+
+
+def expected_order(rows, ids, column, descending=False):
+    """ids sorted like PageQuery: (value, id) in the given direction, NULLs last."""
+    keyed = list(zip(ids, rows))
+    present = [(row[column], cid) for cid, row in keyed if row[column] is not None]
+    missing = [cid for cid, row in keyed if row[column] is None]
+    present.sort(reverse=descending)
+    missing.sort(reverse=descending)
+    return [cid for _, cid in present] + missing
+
+
+def test_pages_cover_every_row_once(client, tag):
+    # Repeated sort values, so pages also split inside runs of equal values
+    rows = [{"name": f"{tag} {i:02d}", "charge_amount": i % 4} for i in range(23)]
+    ids = create_charges(client, rows)
+
+    for sort, descending in (("charge_amount", False), ("-charge_amount", True)):
+        got, pages = all_pages(client, "/charges", {"name__prefix": tag, "sort": sort, "limit": 5})
+        assert [row["id"] for row in got] == expected_order(rows, ids, "charge_amount", descending)
+        assert pages == 5
+
+
+def test_pages_sorted_by_id_by_default(client, tag):
+    ids = create_charges(client, [{"name": f"{tag} {i}"} for i in range(7)])
+
+    got, pages = all_pages(client, "/charges", {"name__prefix": tag, "limit": 3})
+    assert [row["id"] for row in got] == ids
+    assert pages == 3
+
+    got, _ = all_pages(client, "/charges", {"name__prefix": tag, "limit": 3, "sort": "-id"})
+    assert [row["id"] for row in got] == ids[::-1]
+
+
+def test_null_sort_values_come_last_on_every_page(client, tag):
+    amounts = [30, None, 10, None, 20, 10, None, None, 40]
+    rows = [{"name": f"{tag} {i}", "charge_amount": amount} for i, amount in enumerate(amounts)]
+    ids = create_charges(client, rows)
+
+    # limit 2 puts page boundaries before, at and inside the NULL block
+    for sort, descending in (("charge_amount", False), ("-charge_amount", True)):
+        for limit in (1, 2, 4):
+            got, _ = all_pages(client, "/charges", {"name__prefix": tag, "sort": sort, "limit": limit})
+            assert [row["id"] for row in got] == expected_order(rows, ids, "charge_amount", descending)
+
+
+def test_sort_column_outside_fields_is_not_returned(client, tag):
+    rows = [{"name": f"{tag} {i}", "charge_amount": 5 - i} for i in range(5)]
+    ids = create_charges(client, rows)
+
+    got, _ = all_pages(
+        client, "/charges",
+        {"name__prefix": tag, "sort": "charge_amount", "limit": 2, "fields": "name"}
+    )
+    assert [row["id"] for row in got] == ids[::-1]
+    assert all(set(row) == {"id", "name"} for row in got)
+
+
+def test_filters(client, tag):
+    ids = create_charges(client, [
+        {"name": f"{tag} soil", "specification": "IS 2720", "charge_amount": 100},
+        {"name": f"{tag} water", "specification": "IS 3025", "charge_amount": 100},
+        {"name": f"{tag} air", "specification": "IS 5182", "charge_amount": 250},
+    ])
+
+    response = client.get("/charges", params={"name__prefix": tag, "charge_amount": 100})
+    assert [row["id"] for row in response.json()] == ids[:2]
+
+    response = client.get("/charges", params={"name__prefix": tag, "specification__prefix": "IS 3"})
+    assert [row["id"] for row in response.json()] == ids[1:2]
+
+    # LIKE wildcards in a prefix are matched literally
+    response = client.get("/charges", params={"name__prefix": f"{tag} %"})
+    assert response.json() == []
+
+
+def test_rejects_unknown_columns_and_bad_cursors(client):
+    assert client.get("/charges", params={"nope": 1}).status_code == 400
+    assert client.get("/charges", params={"sort": "nope"}).status_code == 400
+    assert client.get("/charges", params={"after": "not-a-cursor"}).status_code == 400
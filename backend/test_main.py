@@ -0,0 +1,42 @@
+from conftest import create_charges
+
+
+def edit(client, *edits):
+    return client.put(
+        "/charges/update-fields",
+        json={"edits": [{"id": i, "column_name": c, "value": v} for i, c, v in edits]},
+    )
+
+
+def names_and_amounts(client, tag):
+    rows = client.get("/charges", params={"name__prefix": tag}).json()
+    return [(row["name"], row["charge_amount"]) for row in rows]
+
+
+def test_update_fields_applies_every_edit(client, tag):
+    a, b = create_charges(client, [{"name": f"{tag} a", "charge_amount": 1}, {"name": f"{tag} b"}])
+
+    response = edit(
+        client,
+        (b, "charge_amount", 20), (a, "name", f"{tag} A"), (b, "NAME", f"{tag} B"), (a, "charge_amount", "10"),
+    )
+    assert response.status_code == 200
+    # One row per id, in the order the ids first appear
+    assert [row["id"] for row in response.json()["rows"]] == [b, a]
+    assert response.json()["updated"] == 2
+    assert names_and_amounts(client, tag) == [(f"{tag} A", 10), (f"{tag} B", 20)]
+
+
+def test_update_fields_is_all_or_nothing(client, tag):
+    [cid] = create_charges(client, [{"name": f"{tag} a", "charge_amount": 1}])
+
+    assert edit(client, (cid, "charge_amount", 2), (999999, "charge_amount", 3)).status_code == 404
+    assert edit(client, (cid, "charge_amount", 2), (cid, "nope", 3)).status_code == 400
+    assert edit(client, (cid, "id", 5)).status_code == 400
+    assert names_and_amounts(client, tag) == [(f"{tag} a", 1)]
+
+
+def test_update_fields_keeps_search_in_step(client, tag):
+    [cid] = create_charges(client, [{"name": f"{tag} old"}])
+    edit(client, (cid, "name", f"{tag} new"))
+    assert [row["name"] for row in client.get("/charges/search", params={"q": tag}).json()] == [f"{tag} new"]
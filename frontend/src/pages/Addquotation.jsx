@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Plus, Trash2, Save } from 'lucide-react';
 
 const AddQuotation = () => {
@@ -9,9 +9,10 @@ const AddQuotation = () => {
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [message, setMessage] = useState(null);
-  const [charges, setCharges] = useState([]);
+  const [chargeResults, setChargeResults] = useState({});
   const [searchTerm, setSearchTerm] = useState({});
   const [showDropdown, setShowDropdown] = useState({});
+  const latestChargeQuery = useRef({});
 
   const API_BASE = 'http://127.0.0.1:8000';
 
@@ -32,16 +33,21 @@ const AddQuotation = () => {
 
   useEffect(() => {
     fetchColumns();
-    fetchCharges();
   }, []);
 
-  const fetchCharges = async () => {
+  const searchCharges = async (index, term) => {
+    latestChargeQuery.current[index] = term;
     try {
-      const response = await fetch(`${API_BASE}/charges`);
+      const response = await fetch(
+        `${API_BASE}/charges/search?q=${encodeURIComponent(term)}&limit=20`
+      );
       const data = await response.json();
-      setCharges(data);
+      // Ignore responses that arrive after a newer keystroke
+      if (latestChargeQuery.current[index] === term) {
+        setChargeResults(prev => ({ ...prev, [index]: data }));
+      }
     } catch (error) {
-      console.error('Error fetching charges:', error);
+      console.error('Error searching charges:', error);
     }
   };
 
@@ -126,6 +132,7 @@ const AddQuotation = () => {
   const handleSampleSearch = (index, value) => {
     setSearchTerm(prev => ({ ...prev, [index]: value }));
     setShowDropdown(prev => ({ ...prev, [index]: true }));
+    searchCharges(index, value);
     
     // Clear specification and unit_rate when user types
     const updatedItems = [...itemsData];
@@ -155,13 +162,7 @@ const AddQuotation = () => {
     setShowDropdown(prev => ({ ...prev, [index]: false }));
   };
 
-  const getFilteredCharges = (index) => {
-    const term = searchTerm[index] || '';
-    if (!term) return charges;
-    return charges.filter(charge =>
-      charge.name.toLowerCase().includes(term.toLowerCase())
-    );
-  };
+  const getFilteredCharges = (index) => chargeResults[index] || [];
 
   const addItem = () => {
     const newItem = {};
@@ -564,7 +565,10 @@ const AddQuotation = () => {
                               type="text"
                               value={searchTerm[index] !== undefined ? searchTerm[index] : item[column.column_name] || ''}
                               onChange={(e) => handleSampleSearch(index, e.target.value)}
-                              onFocus={() => setShowDropdown(prev => ({ ...prev, [index]: true }))}
+                              onFocus={() => {
+                                setShowDropdown(prev => ({ ...prev, [index]: true }));
+                                searchCharges(index, searchTerm[index] || '');
+                              }}
                               onBlur={() => setTimeout(() => setShowDropdown(prev => ({ ...prev, [index]: false })), 200)}
                               style={{...styles.input, backgroundColor: 'white'}}
                               placeholder="Search sample..."
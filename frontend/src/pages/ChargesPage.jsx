@@ -185,21 +185,25 @@ const ChargesPage = () => {
   };
 
   // Inline Editing
+  // Replace edited rows with the versions returned by the server
+  const mergeUpdatedRows = (rows) => {
+    const updated = Object.fromEntries(rows.map(row => [row.id, row]));
+    setData(prev => prev.map(row => updated[row.id] || row));
+  };
+
   const saveInlineEdit = async () => {
     try {
-      const res = await fetch('http://127.0.0.1:8000/charges/update-field', {
+      const res = await fetch('http://127.0.0.1:8000/charges/update-fields', {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          charge_id: editingRowId,
-          column_name: editingColKey,
-          value: editingValue,
+          edits: [{ id: editingRowId, column_name: editingColKey, value: editingValue }],
         }),
       });
       const result = await res.json();
       if (result.status === 'success') {
         message.success('Updated!');
-        await fetchData();
+        mergeUpdatedRows(result.rows);
       } else {
         message.error(result.message || 'Update failed');
       }
@@ -123,21 +123,26 @@ const QuotationsPage = () => {
     setEditingValue('');
   };
 
+  // Replace edited rows with the versions returned by the server
+  const mergeUpdatedRows = (rows) => {
+    const updated = Object.fromEntries(rows.map(row => [row.id, row]));
+    setData(prev => prev.map(row => updated[row.id] || row));
+  };
+
   const saveInlineEdit = async () => {
     try {
-      const res = await fetch('http://127.0.0.1:8000/quotation/update-field', {
+      const res = await fetch('http://127.0.0.1:8000/quotation/update-fields', {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          quotation_id: editingRowId,
-          column_name: editingColKey,
-          value: editingValue,
+          edits: [{ id: editingRowId, column_name: editingColKey, value: editingValue }],
         }),
       });
 
       if (res.ok) {
+        const result = await res.json();
         message.success('Updated successfully');
-        fetchData();
+        mergeUpdatedRows(result.rows);
       } else {
         const err = await res.json();
         message.error(err.detail || 'Update failed');